@@ -0,0 +1,67 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.permissions import SAFE_METHODS
+
+ASYNC_READ_ROUTES = {
+    'tags-list',
+    'tags-detail',
+    'ingredients-list',
+    'ingredients-detail',
+    'recipes-list',
+    'recipes-detail',
+    'recipes-recommended',
+    'recipes-feed',
+}
+
+read_executor = ThreadPoolExecutor(
+    max_workers=settings.ASGI_THREADS, thread_name_prefix='read-view'
+)
+
+
+def render_read(view, request, *args, **kwargs):
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """Serve safe requests of a sync view from a shared thread pool.
+
+    Django runs sync views in one thread per event loop under ASGI;
+    read-only requests do not need that affinity, so they are spread
+    over ASGI_THREADS threads, each with its own DB connection.
+    """
+    serial_view = sync_to_async(view, thread_sensitive=True)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return await serial_view(request, *args, **kwargs)
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            read_executor,
+            functools.partial(
+                context.run, render_read, view, request, *args, **kwargs
+            )
+        )
+
+    wrapper.csrf_exempt = getattr(view, 'csrf_exempt', False)
+    return wrapper
+
+
+def make_async_read_routes(urlpatterns):
+    for pattern in urlpatterns:
+        if getattr(pattern, 'name', None) in ASYNC_READ_ROUTES:
+            pattern.callback = async_read_view(pattern.callback)
+    return urlpatterns
@@ -0,0 +1,86 @@
+import bisect
+import threading
+
+from api.cache import get_cache_version
+from recipes.models import Ingredient
+
+
+def normalize(value):
+    return value.casefold().replace('ё', 'е').strip()
+
+
+def trigrams(value):
+    return {value[index:index + 3] for index in range(len(value) - 2)}
+
+
+class IngredientIndex:
+    """In-process autocomplete index over Ingredient names.
+
+    Prefix matches are found by bisecting a sorted list of normalized
+    names, substring matches through a trigram posting map. The index is
+    rebuilt lazily when the 'ingredients' cache version changes. The
+    version lives in the shared cache (CACHE_IS_SHARED, enforced for
+    several gunicorn workers), so every worker picks up edits made by
+    the others; with a process-local cache only the editing process
+    does.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._state = ([], [], {})
+
+    def build(self, version=None):
+        rows = sorted(
+            (normalize(name), pk, name, measurement_unit)
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            )
+        )
+        postings = {}
+        for position, row in enumerate(rows):
+            for trigram in trigrams(row[0]):
+                postings.setdefault(trigram, []).append(position)
+        self._state = (
+            [row[0] for row in rows],
+            [
+                {'id': pk, 'name': name, 'measurement_unit': unit}
+                for _, pk, name, unit in rows
+            ],
+            postings,
+        )
+        self._version = version
+
+    def refresh(self):
+        version = get_cache_version('ingredients')
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self.build(version)
+
+    def search(self, query):
+        """Return prefix matches first, then the remaining substrings."""
+        self.refresh()
+        query = normalize(query)
+        keys, items, postings = self._state
+        start = bisect.bisect_left(keys, query)
+        end = start
+        while end < len(keys) and keys[end].startswith(query):
+            end += 1
+        prefix = range(start, end)
+        if len(query) < 3:
+            candidates = range(len(keys))
+        else:
+            matches = sorted(
+                (postings.get(trigram, []) for trigram in trigrams(query)),
+                key=len
+            )
+            candidates = sorted(set(matches[0]).intersection(*matches[1:]))
+        substring = [
+            position for position in candidates
+            if not start <= position < end and query in keys[position]
+        ]
+        return [items[position] for position in (*prefix, *substring)]
+
+
+ingredient_index = IngredientIndex()
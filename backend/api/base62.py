@@ -0,0 +1,34 @@
+import string
+
+ALPHABET = string.digits + string.ascii_letters
+BASE = len(ALPHABET)
+INDEX = {char: value for value, char in enumerate(ALPHABET)}
+# Primary keys are bigint: longer codes or larger values cannot exist.
+MAX_VALUE = 2 ** 63 - 1
+MAX_LENGTH = 11
+
+
+def encode(number):
+    """Encode a non-negative integer as a base62 string."""
+    if number == 0:
+        return ALPHABET[0]
+    chars = []
+    while number:
+        number, remainder = divmod(number, BASE)
+        chars.append(ALPHABET[remainder])
+    return ''.join(reversed(chars))
+
+
+def decode(code):
+    """Decode a base62 string, None if it is not a canonical code."""
+    if len(code) > MAX_LENGTH:
+        return None
+    number = 0
+    for char in code:
+        if char not in INDEX:
+            return None
+        number = number * BASE + INDEX[char]
+    # Codes with leading zeros would alias the same number.
+    if not code or number > MAX_VALUE or encode(number) != code:
+        return None
+    return number
@@ -0,0 +1,240 @@
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.cache import invalidate_cache
+from api.constants import FEED_MAX_ENTRIES
+from api.feeds import get_feed_positions, rebuild_feeds
+from api.paginations import RecipePagination
+from api.recommendations import rebuild_similarities
+from recipes.counters import recount_counters
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingList,
+    Subscription,
+    Tag,
+    User,
+)
+
+PREFIX = 'bench'
+
+
+def seed(users=50, recipes=1000, ingredients=500, ingredients_per_recipe=8,
+         cart_size=20, favorites=20, subscriptions=20, random_seed=0):
+    """Create a synthetic dataset with bulk inserts.
+
+    Returns the user the scenarios run as; it has a shopping cart,
+    favorites and subscriptions of the requested size.
+    """
+    rand = random.Random(random_seed)
+    ingredients_per_recipe = min(ingredients_per_recipe, ingredients)
+    User.objects.bulk_create(
+        User(
+            username=f'{PREFIX}_user_{index}',
+            email=f'{PREFIX}_user_{index}@example.com',
+            first_name='Bench',
+            last_name=str(index),
+        ) for index in range(users)
+    )
+    authors = list(User.objects.filter(username__startswith=f'{PREFIX}_user_'))
+    Tag.objects.bulk_create(
+        Tag(name=f'{PREFIX}_tag_{index}', slug=f'{PREFIX}-tag-{index}')
+        for index in range(3)
+    )
+    tag_ids = list(Tag.objects.filter(
+        slug__startswith=f'{PREFIX}-tag-'
+    ).values_list('id', flat=True))
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f'{PREFIX}_ingredient_{index}', measurement_unit='г')
+        for index in range(ingredients)
+    )
+    ingredient_ids = list(Ingredient.objects.filter(
+        name__startswith=f'{PREFIX}_ingredient_'
+    ).values_list('id', flat=True))
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                author=authors[index % len(authors)],
+                name=f'{PREFIX}_recipe_{index}',
+                text=f'Описание рецепта {index}',
+                cooking_time=rand.randint(1, 120),
+                image='recipes/benchmark.png',
+            ) for index in range(recipes)
+        ),
+        batch_size=5000
+    )
+    recipe_ids = list(Recipe.objects.filter(
+        name__startswith=f'{PREFIX}_recipe_'
+    ).values_list('id', flat=True))
+    Recipe.tags.through.objects.bulk_create(
+        (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in rand.sample(tag_ids, 2)
+        ),
+        batch_size=10000
+    )
+    IngredientAmount.objects.bulk_create(
+        (
+            IngredientAmount(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=rand.randint(1, 500)
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in rand.sample(
+                ingredient_ids, ingredients_per_recipe
+            )
+        ),
+        batch_size=10000
+    )
+    user = authors[0]
+    ShoppingList.objects.bulk_create(
+        ShoppingList(user=user, recipes_id=recipe_id)
+        for recipe_id in rand.sample(recipe_ids, min(cart_size, recipes))
+    )
+    Favorite.objects.bulk_create(
+        Favorite(user=user, recipes_id=recipe_id)
+        for recipe_id in rand.sample(recipe_ids, min(favorites, recipes))
+    )
+    Subscription.objects.bulk_create(
+        Subscription(user=user, subscriber=author)
+        for author in authors[1:subscriptions + 1]
+    )
+    # Favorites of the other users give the recommendations co-occurrences.
+    Favorite.objects.bulk_create(
+        (
+            Favorite(user=author, recipes_id=recipe_id)
+            for author in authors[1:]
+            for recipe_id in rand.sample(recipe_ids, min(favorites, recipes))
+        ),
+        batch_size=10000
+    )
+    recount_counters(Recipe, User, Favorite, ShoppingList, Subscription)
+    rebuild_similarities()
+    rebuild_feeds()
+    invalidate_cache('tags')
+    invalidate_cache('ingredients')
+    return user
+
+
+def get_scenarios(user):
+    """Map a scenario name to the requests it sends.
+
+    A scenario is a GET url or a list of (method, url, data, status)
+    steps; write scenarios undo their own changes so they can repeat.
+    """
+    recipe = Recipe.objects.filter(author=user).first()
+    tag = Tag.objects.filter(slug__startswith=f'{PREFIX}-tag-').first()
+    ingredient = Ingredient.objects.filter(
+        name__startswith=f'{PREFIX}_ingredient_'
+    ).first()
+    deep_offset = max(Recipe.objects.count() - 6, 0)
+    feed = get_feed_positions(user, None, FEED_MAX_ENTRIES)
+    cursor = RecipePagination().encode_cursor(feed[len(feed) // 2])
+    bulk = {'recipes': list(Recipe.objects.exclude(
+        favorite_recipes__user=user
+    ).exclude(
+        shoppinglist_recipes__user=user
+    ).values_list('id', flat=True)[:20])}
+    return {
+        'users-list': '/api/users/?limit=6',
+        'users-detail': f'/api/users/{user.pk}/',
+        'users-me': '/api/users/me/',
+        'users-subscriptions': '/api/users/subscriptions/?recipes_limit=3',
+        'tags-list': '/api/tags/',
+        'tags-detail': f'/api/tags/{tag.pk}/',
+        'ingredients-list': '/api/ingredients/',
+        'ingredients-detail': f'/api/ingredients/{ingredient.pk}/',
+        'ingredients-search': f'/api/ingredients/?name={PREFIX}_ingredient_1',
+        'recipes-list': '/api/recipes/?limit=6',
+        'recipes-list-deep': f'/api/recipes/?limit=6&offset={deep_offset}',
+        'recipes-list-cursor': '/api/recipes/?limit=6&cursor=',
+        'recipes-list-tags': (
+            f'/api/recipes/?limit=6&tags={PREFIX}-tag-0&tags={PREFIX}-tag-1'
+        ),
+        'recipes-list-favorited': '/api/recipes/?limit=6&is_favorited=1',
+        'recipes-search': '/api/recipes/?limit=6&search=рецепта',
+        'recipes-detail': f'/api/recipes/{recipe.pk}/',
+        'recipes-get-link': f'/api/recipes/{recipe.pk}/get-link/',
+        'recipes-download-shopping-cart': (
+            '/api/recipes/download_shopping_cart/'
+        ),
+        'recipes-recommended': '/api/recipes/recommended/?limit=10',
+        'recipes-feed': '/api/recipes/feed/?limit=6',
+        'recipes-feed-deep': f'/api/recipes/feed/?limit=6&cursor={cursor}',
+        'recipes-favorite-bulk': [
+            ('post', '/api/recipes/favorite/bulk/', bulk, 201),
+            ('delete', '/api/recipes/favorite/bulk/', bulk, 200),
+        ],
+        'recipes-shopping-cart-bulk': [
+            ('post', '/api/recipes/shopping_cart/bulk/', bulk, 201),
+            ('delete', '/api/recipes/shopping_cart/bulk/', bulk, 200),
+        ],
+        'short-link-redirect': [
+            ('get', f'/s/{recipe.short_link}', None, 302),
+        ],
+    }
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def fetch(client, scenario):
+    if isinstance(scenario, str):
+        scenario = [('get', scenario, None, 200)]
+    for method, url, data, status in scenario:
+        kwargs = {} if data is None else {'data': data, 'format': 'json'}
+        response = getattr(client, method)(url, **kwargs)
+        if response.status_code != status:
+            raise RuntimeError(f'{url} вернул {response.status_code}')
+        if response.streaming:
+            b''.join(response.streaming_content)
+
+
+def run_scenario(client, scenario, iterations):
+    """Return query count, p50/p99 latency (ms) and peak allocation (KiB).
+
+    The query count is taken from a cold request, so cached routes report
+    the cost of a cache miss; latency is measured on the following ones.
+    """
+    invalidate_cache('tags')
+    invalidate_cache('ingredients')
+    with CaptureQueriesContext(connection) as context:
+        fetch(client, scenario)
+    queries = len(context.captured_queries)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fetch(client, scenario)
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fetch(client, scenario)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'queries': queries,
+        'p50_ms': round(statistics.median(timings), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run(user, iterations=30, only=None):
+    client = APIClient()
+    client.force_authenticate(user)
+    return {
+        name: run_scenario(client, scenario, iterations)
+        for name, scenario in get_scenarios(user).items()
+        if not only or name in only
+    }
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.constants import REFERENCE_CACHE_TIMEOUT
+from api.metrics import CACHE_REQUESTS
+
+
+def get_cache_version(namespace):
+    return cache.get_or_set(
+        f'{namespace}:version', time.time_ns(), timeout=None
+    )
+
+
+def invalidate_cache(namespace):
+    """Bump the namespace version so that all its cached keys go stale."""
+    try:
+        cache.incr(f'{namespace}:version')
+    except ValueError:
+        cache.set(f'{namespace}:version', time.time_ns(), timeout=None)
+
+
+def make_etag(data):
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return '"{}"'.format(hashlib.md5(payload.encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    tags = {
+        tag.strip().replace('W/', '', 1) for tag in if_none_match.split(',')
+    }
+    return '*' in tags or etag in tags
+
+
+class CachedReadOnlyMixin:
+    """Cache serialized list/retrieve payloads and answer with ETag/304.
+
+    Entries are keyed by the request path and the version of
+    cache_namespace, which is bumped by api.signals on model changes.
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, get_response, request, *args, **kwargs):
+        key = '{}:{}:{}'.format(
+            self.cache_namespace,
+            get_cache_version(self.cache_namespace),
+            request.get_full_path(),
+        )
+        cached = cache.get(key)
+        CACHE_REQUESTS.labels(
+            self.cache_namespace, 'miss' if cached is None else 'hit'
+        ).inc()
+        if cached is None:
+            response = get_response(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cached = (response.data, make_etag(response.data))
+            cache.set(key, cached, REFERENCE_CACHE_TIMEOUT)
+        data, etag = cached
+        if etag_matches(request, etag):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        return Response(data, headers={'ETag': etag})
@@ -6,4 +6,28 @@ MAX_LENGTH_SLUG = 32
 MAX_LENGTH_INGREDIENT = 128
 MAX_LENGTH_MEASURMENT = 64
 MAX_LENGTH_RECIPE = 256
-MAX_LENGTH_RECIPE_SHORT = 200
+SHOPPING_LIST_CHUNK_SIZE = 2000
+SHOPPING_LIST_FILENAME = 'shopping_cart'
+REFERENCE_CACHE_TIMEOUT = 60 * 60 * 24
+SEARCH_CONFIG = 'russian'
+SHORT_LINK_CACHE_TIMEOUT = 60 * 60 * 24
+SHORT_LINK_LOCAL_SIZE = 10000
+SHORT_LINK_LOCAL_TIMEOUT = 60
+SHORT_LINK_FLUSH_SIZE = 100
+SHORT_LINK_FLUSH_INTERVAL = 10
+BULK_MAX_RECIPES = 500
+IMAGE_RENDITIONS = {'thumbnail': 160, 'card': 480, 'full': 1280}
+IMAGE_RENDITION_QUALITY = 80
+IMAGE_UPLOAD_MAX_BYTES = 20 * 1024 * 1024
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+IMAGE_UPLOAD_FORMATS = ('jpeg', 'png', 'gif', 'webp')
+CONTENT_DIR = 'content'
+RECOMMENDATIONS_TOP_K = 20
+RECOMMENDATIONS_MAX_USER_ITEMS = 500
+RECOMMENDATIONS_FAVORITE_WEIGHT = 1.0
+RECOMMENDATIONS_CART_WEIGHT = 0.5
+RECOMMENDATIONS_LIMIT = 10
+RECOMMENDATIONS_MAX_LIMIT = 50
+FEED_MAX_ENTRIES = 500
+FEED_FANOUT_MAX_FOLLOWERS = 1000
+FEED_BATCH_SIZE = 1000
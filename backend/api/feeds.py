@@ -0,0 +1,147 @@
+from django.db.models import F, Q, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+
+from api.constants import (
+    FEED_BATCH_SIZE,
+    FEED_FANOUT_MAX_FOLLOWERS,
+    FEED_MAX_ENTRIES,
+)
+from recipes.models import FeedEntry, Recipe, Subscription, User
+
+
+def is_pulled(author):
+    """Authors with too many followers are read on demand, not fanned out."""
+    return author.subscribers_count > FEED_FANOUT_MAX_FOLLOWERS
+
+
+def create_entries(user_ids, positions):
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(user_id=user_id, recipe_id=pk, pub_date=pub_date)
+            for user_id in user_ids
+            for pub_date, pk in positions
+        ),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def get_follower_ids(author):
+    return list(Subscription.objects.filter(
+        subscriber=author
+    ).values_list('user', flat=True))
+
+
+def get_author_positions(author):
+    """Return (pub_date, id) of the newest recipes a timeline can hold."""
+    return list(Recipe.objects.filter(author=author).order_by(
+        '-pub_date', '-id'
+    ).values_list('pub_date', 'id')[:FEED_MAX_ENTRIES])
+
+
+def fan_out_recipe(recipe):
+    """Push a new recipe into the timelines of its author's followers."""
+    if is_pulled(recipe.author):
+        return
+    followers = get_follower_ids(recipe.author)
+    create_entries(followers, [(recipe.pub_date, recipe.pk)])
+    trim_feeds(followers)
+
+
+def add_author_to_feed(user, author):
+    """Fill the user's timeline after a subscribe.
+
+    Called after subscribers_count was incremented; the fresh value
+    decides, so the subscribe that makes the author pulled is not
+    fanned out.
+    """
+    author.refresh_from_db(fields=['subscribers_count'])
+    if not is_pulled(author):
+        create_entries([user.pk], get_author_positions(author))
+        trim_feeds([user.pk])
+
+
+def remove_author_from_feed(user, author):
+    """Drop the author from the user's timeline after an unsubscribe.
+
+    Called once per deleted subscription, after subscribers_count was
+    decremented. The unsubscribe that brings a pulled author back to
+    FEED_FANOUT_MAX_FOLLOWERS writes the recipes read on demand so far
+    into the remaining followers' timelines; later ones are fanned out.
+    """
+    FeedEntry.objects.filter(user=user, recipe__author=author).delete()
+    author.refresh_from_db(fields=['subscribers_count'])
+    if author.subscribers_count == FEED_FANOUT_MAX_FOLLOWERS:
+        followers = get_follower_ids(author)
+        create_entries(followers, get_author_positions(author))
+        trim_feeds(followers)
+
+
+def trim_feeds(user_ids=None):
+    """Keep only the FEED_MAX_ENTRIES newest entries of each timeline.
+
+    Only the timelines of user_ids are trimmed when given, so writes
+    keep them bounded without scanning the whole table.
+    """
+    entries = FeedEntry.objects.all()
+    if user_ids is not None:
+        if not user_ids:
+            return 0
+        entries = entries.filter(user__in=user_ids)
+    ranked_sql, params = entries.annotate(
+        row_number=Window(
+            expression=RowNumber(),
+            partition_by=F('user_id'),
+            order_by=[F('pub_date').desc(), F('recipe_id').desc()],
+        )
+    ).values('id', 'row_number').query.sql_with_params()
+    deleted, _ = FeedEntry.objects.filter(id__in=RawSQL(
+        f'SELECT ranked.id FROM ({ranked_sql}) ranked '
+        f'WHERE ranked.row_number > %s',
+        (*params, FEED_MAX_ENTRIES)
+    )).delete()
+    return deleted
+
+
+def rebuild_feeds():
+    """Refill every timeline from subscriptions, one author at a time."""
+    FeedEntry.objects.all().delete()
+    authors = User.objects.filter(
+        subscribers_count__gt=0,
+        subscribers_count__lte=FEED_FANOUT_MAX_FOLLOWERS,
+        recipes_count__gt=0,
+    ).only('pk', 'subscribers_count')
+    for author in authors.iterator():
+        create_entries(get_follower_ids(author), get_author_positions(author))
+    return FeedEntry.objects.count()
+
+
+def get_feed_positions(user, position, limit):
+    """Return up to limit (pub_date, id) of the feed, newest first.
+
+    The user's materialized timeline is merged with the recipes of
+    followed authors that are not fanned out. Both reads are index range
+    scans from the cursor position, so deep pages cost the same.
+    """
+    entries = FeedEntry.objects.filter(user=user)
+    pulled = Recipe.objects.filter(author__in=Subscription.objects.filter(
+        user=user, subscriber__subscribers_count__gt=FEED_FANOUT_MAX_FOLLOWERS
+    ).values('subscriber'))
+    if position is not None:
+        pub_date, pk = position
+        entries = entries.filter(
+            Q(pub_date__lte=pub_date)
+            & (Q(pub_date__lt=pub_date) | Q(recipe__lt=pk))
+        )
+        pulled = pulled.filter(
+            Q(pub_date__lte=pub_date)
+            & (Q(pub_date__lt=pub_date) | Q(id__lt=pk))
+        )
+    timeline = entries.order_by('-pub_date', '-recipe_id').values_list(
+        'pub_date', 'recipe'
+    )[:limit]
+    pulled = pulled.order_by('-pub_date', '-id').values_list(
+        'pub_date', 'id'
+    )[:limit]
+    return sorted(set(timeline) | set(pulled), reverse=True)[:limit]
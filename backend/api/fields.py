@@ -0,0 +1,111 @@
+import base64
+import binascii
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+from api.constants import (IMAGE_UPLOAD_FORMATS,
+                           IMAGE_UPLOAD_MAX_BYTES,
+                           IMAGE_UPLOAD_MAX_PIXELS)
+
+BASE64_HEADER = ';base64,'
+# A multiple of 4 base64 characters decodes on its own.
+BASE64_CHUNK_SIZE = 64 * 1024 * 4
+
+
+class StreamingBase64ImageField(serializers.ImageField):
+    """Image sent as a base64 string or a data URL.
+
+    The string is decoded chunk by chunk into a spooled temporary file
+    that moves to disk past FILE_UPLOAD_MAX_MEMORY_SIZE. The size limit
+    is checked before decoding and the pixel limit from the image
+    header before any pixel is decoded.
+    """
+
+    default_error_messages = {
+        'invalid': 'Загрузите корректное изображение.',
+        'too_large': (
+            'Размер изображения не должен превышать {max_bytes} байт.'
+        ),
+        'too_many_pixels': (
+            'Изображение не должно содержать больше {max_pixels} пикселей.'
+        ),
+    }
+
+    def to_internal_value(self, data):
+        if data == '':
+            # Left to the serializer, as with the previous field.
+            return None
+        if not isinstance(data, str):
+            self.fail('invalid')
+        start = data.find(BASE64_HEADER)
+        start = 0 if start == -1 else start + len(BASE64_HEADER)
+        if (len(data) - start) * 3 // 4 > IMAGE_UPLOAD_MAX_BYTES:
+            self.fail('too_large', max_bytes=IMAGE_UPLOAD_MAX_BYTES)
+        file = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        try:
+            for chunk in self.iter_base64_chunks(data, start):
+                file.write(base64.b64decode(chunk, validate=True))
+        except (binascii.Error, ValueError):
+            file.close()
+            self.fail('invalid')
+        try:
+            image_format = self.check_image(file)
+        except serializers.ValidationError:
+            file.close()
+            raise
+        size = file.tell()
+        file.seek(0)
+        extension = 'jpg' if image_format == 'jpeg' else image_format
+        return UploadedFile(
+            file=file,
+            name=f'{uuid.uuid4()}.{extension}',
+            content_type=Image.MIME.get(image_format.upper()),
+            size=size,
+        )
+
+    @staticmethod
+    def iter_base64_chunks(data, start):
+        """Yield whitespace-free chunks of a multiple of 4 characters.
+
+        Line-wrapped base64 (MIME, 76 columns) is accepted: whitespace is
+        dropped per chunk and the characters past the last full quantum
+        are carried over to the next chunk.
+        """
+        rest = ''
+        for offset in range(start, len(data), BASE64_CHUNK_SIZE):
+            chunk = rest + ''.join(
+                data[offset:offset + BASE64_CHUNK_SIZE].split()
+            )
+            end = len(chunk) - len(chunk) % 4
+            chunk, rest = chunk[:end], chunk[end:]
+            if chunk:
+                yield chunk
+        if rest:
+            # Not a whole quantum: b64decode rejects it as invalid.
+            yield rest
+
+    def check_image(self, file):
+        file.seek(0)
+        try:
+            with Image.open(file) as image:
+                # Only the header has been read at this point.
+                width, height = image.size
+                if width * height > IMAGE_UPLOAD_MAX_PIXELS:
+                    self.fail(
+                        'too_many_pixels', max_pixels=IMAGE_UPLOAD_MAX_PIXELS
+                    )
+                image_format = (image.format or '').lower()
+                image.verify()
+        except (OSError, SyntaxError, Image.DecompressionBombError):
+            self.fail('invalid')
+        if image_format not in IMAGE_UPLOAD_FORMATS:
+            self.fail('invalid')
+        file.seek(0, 2)
+        return image_format
@@ -1,5 +1,9 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Q
 from django_filters import rest_framework as filters
 
+from api.constants import SEARCH_CONFIG
 from recipes.models import Favorite, ShoppingList, Recipe
 
 
@@ -14,12 +18,20 @@ class RecipetFilter(filters.FilterSet):
     is_in_shopping_cart = filters.NumberFilter(
         method='filter_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='filter_search')
+    ordering = filters.OrderingFilter(
+        fields=(
+            ('favorites_count', 'popularity'),
+            ('in_carts_count', 'in_carts'),
+            ('pub_date', 'pub_date'),
+        )
+    )
 
     def filter_tags(self, queryset, name, value):
         if not value:
             return queryset
         tags = [tag_value for tag_value in self.request.GET.getlist('tags')]
-        queryset = queryset.filter(tags__slug__in=tags)
+        queryset = queryset.filter(tags__slug__in=tags).distinct()
 
         return queryset
 
@@ -39,6 +51,21 @@ class RecipetFilter(filters.FilterSet):
             id__in=shopping_cart.values_list('recipes_id', flat=True)
         )
 
+    def filter_search(self, queryset, name, value):
+        if connections[queryset.db].vendor != 'postgresql':
+            return queryset.filter(
+                Q(name__icontains=value) | Q(text__icontains=value)
+            )
+        query = SearchQuery(
+            value, config=SEARCH_CONFIG, search_type='websearch'
+        )
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-pub_date')
+
     class Meta:
         model = Recipe
-        fields = ['tags', 'author', 'is_favorited', 'is_in_shopping_cart']
+        fields = [
+            'tags', 'author', 'is_favorited', 'is_in_shopping_cart',
+            'search', 'ordering'
+        ]
@@ -0,0 +1,107 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, features
+
+from api.constants import IMAGE_RENDITION_QUALITY, IMAGE_RENDITIONS
+from api.storage import add_references, release_references
+
+logger = logging.getLogger(__name__)
+
+if features.check('webp'):
+    RENDITION_FORMAT, RENDITION_EXTENSION = 'WEBP', 'webp'
+else:
+    RENDITION_FORMAT, RENDITION_EXTENSION = 'JPEG', 'jpg'
+
+image_executor = (
+    ThreadPoolExecutor(
+        max_workers=settings.IMAGE_WORKERS, thread_name_prefix='image'
+    ) if settings.IMAGE_WORKERS else None
+)
+
+
+def open_image(field_file):
+    """Decode the stored image upright and in a mode the target
+    format can encode. EXIF and other metadata are not carried over.
+    """
+    with field_file.open('rb'):
+        image = Image.open(field_file)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+    if has_alpha and RENDITION_FORMAT == 'WEBP':
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def encode(image, max_size):
+    rendition = image.copy()
+    rendition.thumbnail((max_size, max_size), Image.LANCZOS)
+    buffer = io.BytesIO()
+    rendition.save(
+        buffer, RENDITION_FORMAT, quality=IMAGE_RENDITION_QUALITY
+    )
+    return buffer.getvalue()
+
+
+def store(content):
+    # The storage names the file by its content hash.
+    return default_storage.save(
+        f'rendition.{RENDITION_EXTENSION}', ContentFile(content)
+    )
+
+
+def make_renditions(field_file):
+    image = open_image(field_file)
+    return {
+        rendition: store(encode(image, max_size))
+        for rendition, max_size in IMAGE_RENDITIONS.items()
+    }
+
+
+def process_renditions(model, pk, field, renditions_field):
+    close_old_connections()
+    try:
+        instance = model.objects.filter(pk=pk).only(
+            field, renditions_field
+        ).first()
+        if instance is None or not getattr(instance, field):
+            return
+        source = getattr(instance, field)
+        renditions = make_renditions(source)
+        # Skip the write if the image was replaced in the meantime.
+        if model.objects.filter(pk=pk, **{field: source.name}).update(
+            **{renditions_field: renditions}
+        ):
+            add_references(set(renditions.values()))
+            release_references(
+                set(getattr(instance, renditions_field).values())
+            )
+    except Exception:
+        logger.exception(
+            'Rendering %s of %s %s failed', field, model.__name__, pk
+        )
+    finally:
+        close_old_connections()
+
+
+def schedule_renditions(instance, field, renditions_field):
+    """Render the image of instance once the current transaction commits.
+
+    Runs on IMAGE_WORKERS background threads, or inline when it is 0.
+    Until then the renditions are empty and clients use the original.
+    """
+    args = (type(instance), instance.pk, field, renditions_field)
+    if image_executor is None:
+        transaction.on_commit(lambda: process_renditions(*args))
+    else:
+        transaction.on_commit(
+            lambda: image_executor.submit(process_renditions, *args)
+        )
@@ -0,0 +1,154 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from api import benchmarks
+
+DEFAULT_THRESHOLDS = Path(settings.BASE_DIR) / 'benchmark_thresholds.json'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными и измеряет число запросов, '
+        'задержку и память для маршрутов API. Все данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--ingredients', type=int, default=500)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--cart-size', type=int, default=20)
+        parser.add_argument('--favorites', type=int, default=20)
+        parser.add_argument('--subscriptions', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument(
+            '--only', action='append',
+            help='Запустить только указанный сценарий'
+        )
+        parser.add_argument(
+            '--thresholds', type=Path, default=DEFAULT_THRESHOLDS,
+            help='Файл с допустимыми значениями'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help=(
+                'Завершиться с ошибкой при росте числа запросов или '
+                'памяти; превышение задержки только выводится'
+            )
+        )
+        parser.add_argument(
+            '--update-thresholds', action='store_true',
+            help='Записать текущие результаты в файл порогов'
+        )
+        parser.add_argument(
+            '--latency-tolerance', type=float, default=2.0,
+            help='Во сколько раз p99 может превысить записанное значение'
+        )
+        parser.add_argument(
+            '--latency-slack', type=float, default=5.0,
+            help='Абсолютный запас для p99 в миллисекундах'
+        )
+        parser.add_argument(
+            '--memory-tolerance', type=float, default=1.5,
+            help='Во сколько раз пик памяти может превысить записанный'
+        )
+        parser.add_argument('--output', type=Path, help='Сохранить JSON')
+
+    def handle(self, *args, **options):
+        results = {}
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+            ), transaction.atomic():
+                self.stdout.write(self.style.NOTICE('Заполнение базы...'))
+                user = benchmarks.seed(
+                    users=options['users'],
+                    recipes=options['recipes'],
+                    ingredients=options['ingredients'],
+                    ingredients_per_recipe=options['ingredients_per_recipe'],
+                    cart_size=options['cart_size'],
+                    favorites=options['favorites'],
+                    subscriptions=options['subscriptions'],
+                )
+                results = benchmarks.run(
+                    user, options['iterations'], options['only']
+                )
+                raise Rollback
+        except Rollback:
+            pass
+        self.report(results)
+        if options['output']:
+            options['output'].write_text(json.dumps(results, indent=2))
+        if options['update_thresholds']:
+            options['thresholds'].write_text(
+                json.dumps(results, indent=2, sort_keys=True) + '\n'
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Пороги записаны в {options["thresholds"]}'
+            ))
+        if options['check']:
+            self.check_thresholds(results, options)
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"сценарий":<32}{"запросы":>8}{"p50, мс":>10}'
+            f'{"p99, мс":>10}{"пик, КиБ":>10}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<32}{result["queries"]:>8}{result["p50_ms"]:>10}'
+                f'{result["p99_ms"]:>10}{result["peak_kib"]:>10}'
+            )
+
+    def check_thresholds(self, results, options):
+        """Fail on more queries or memory, warn on slower p99.
+
+        Query counts and allocations do not depend on the machine, the
+        recorded timings do, so they only produce warnings.
+        """
+        path = options['thresholds']
+        if not path.exists():
+            raise CommandError(f'Файл порогов {path} не найден.')
+        thresholds = json.loads(path.read_text())
+        failures = []
+        warnings = []
+        for name, result in results.items():
+            expected = thresholds.get(name)
+            if expected is None:
+                continue
+            if result['queries'] > expected['queries']:
+                failures.append(
+                    f'{name}: запросов {result["queries"]}, '
+                    f'допустимо {expected["queries"]}'
+                )
+            allowed = expected['peak_kib'] * options['memory_tolerance']
+            if result['peak_kib'] > allowed:
+                failures.append(
+                    f'{name}: пик памяти {result["peak_kib"]} КиБ, '
+                    f'допустимо {allowed:.1f} КиБ'
+                )
+            allowed = max(
+                expected['p99_ms'] * options['latency_tolerance'],
+                expected['p99_ms'] + options['latency_slack']
+            )
+            if result['p99_ms'] > allowed:
+                warnings.append(
+                    f'{name}: p99 {result["p99_ms"]} мс, '
+                    f'записано {expected["p99_ms"]} мс'
+                )
+        for warning in warnings:
+            self.stdout.write(self.style.WARNING(warning))
+        if failures:
+            raise CommandError(
+                'Превышены пороги производительности:\n' + '\n'.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS('Пороги не превышены.'))
@@ -0,0 +1,106 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return (
+        statistics.median(timings),
+        timings[int(len(timings) * 0.99) - 1],
+    )
+
+
+def select_one():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def reconnect_and_select_one():
+    connection.close()
+    select_one()
+
+
+def fetch(client, url):
+    response = client.get(url)
+    if response.status_code != 200:
+        raise CommandError(f'{url} вернул {response.status_code}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет накладные расходы на подключение к базе данных: '
+        'новое подключение на каждый запрос, постоянные подключения '
+        'и пул подключений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='/api/recipes/?limit=1',
+            help='Адрес, запросы к которому измеряются'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=200,
+            help='Число запросов в каждом режиме'
+        )
+        parser.add_argument(
+            '--pool-size', type=int, default=10,
+            help='Размер пула для режима pool'
+        )
+
+    def handle(self, *args, **options):
+        modes = {
+            'new connection': {'CONN_MAX_AGE': 0, 'POOL_SIZE': 0},
+            'persistent': {'CONN_MAX_AGE': None, 'POOL_SIZE': 0},
+        }
+        # The pool is implemented by the foodgram.db backend only.
+        if hasattr(connection, 'pool_size'):
+            modes['pool'] = {
+                'CONN_MAX_AGE': 0, 'POOL_SIZE': options['pool_size']
+            }
+        original = {
+            key: connection.settings_dict.get(key)
+            for key in ('CONN_MAX_AGE', 'POOL_SIZE')
+        }
+        client = Client()
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+            ):
+                self.measure_modes(client, modes, options)
+        finally:
+            connection.close()
+            connection.settings_dict.update(original)
+
+    def measure_modes(self, client, modes, options):
+        self.stdout.write('SELECT 1 с переподключением и без:')
+        for name, func in (
+            ('connect + query', reconnect_and_select_one),
+            ('query', select_one),
+        ):
+            p50, p99 = measure(func, options['repeat'])
+            self.stdout.write(
+                f'{name:<16} p50={p50:.3f}ms p99={p99:.3f}ms'
+            )
+        self.stdout.write(f'GET {options["url"]}:')
+        for name, mode in modes.items():
+            connection.close()
+            connection.settings_dict.update(mode)
+            # Warm up caches and the pool outside the measurement.
+            fetch(client, options['url'])
+            p50, p99 = measure(
+                lambda: fetch(client, options['url']), options['repeat']
+            )
+            self.stdout.write(
+                f'{name:<16} p50={p50:.3f}ms p99={p99:.3f}ms'
+            )
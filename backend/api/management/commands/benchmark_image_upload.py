@@ -0,0 +1,72 @@
+import base64
+import io
+import os
+import time
+import tracemalloc
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from api.fields import StreamingBase64ImageField
+
+
+def make_payload(megabytes):
+    """Data URL of a PNG of random pixels, which PNG cannot compress."""
+    side = int((megabytes * 1024 * 1024 / 3) ** 0.5)
+    image = Image.frombytes('RGB', (side, side), os.urandom(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', compress_level=1)
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}', buffer.tell()
+
+
+def decode_in_memory(payload):
+    """What the previous field and AvatarSerializer.update did."""
+    decoded = base64.b64decode(payload.split(';base64,')[1])
+    Image.open(io.BytesIO(decoded)).verify()
+    file = ContentFile(decoded)
+    return ContentFile(file.read())
+
+
+def decode_streaming(payload):
+    return StreamingBase64ImageField().to_internal_value(payload)
+
+
+def measure(func, payload):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(payload)
+    duration = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result.close()
+    return duration, peak / 1024 / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пиковое потребление памяти при разборе изображения '
+        'в base64 целиком в памяти и потоково.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=10,
+            help='Размер изображения в мегабайтах'
+        )
+
+    def handle(self, *args, **options):
+        payload, size = make_payload(options['size'])
+        self.stdout.write(
+            f'изображение {size / 1024 / 1024:.1f} МБ, '
+            f'строка base64 {len(payload) / 1024 / 1024:.1f} МБ'
+        )
+        for name, func in (
+            ('in memory', decode_in_memory),
+            ('streaming', decode_streaming),
+        ):
+            duration, peak = measure(func, payload)
+            self.stdout.write(
+                f'{name:<10} {duration:.1f}ms, пик памяти {peak:.1f} МБ'
+            )
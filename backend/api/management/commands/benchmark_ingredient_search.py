@@ -0,0 +1,59 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.autocomplete import ingredient_index
+from recipes.models import Ingredient
+
+
+def measure(func, queries, repeat):
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return (
+        statistics.median(timings),
+        timings[int(len(timings) * 0.99) - 1],
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку поиска ингредиентов через ORM (icontains) '
+        'и через индекс автодополнения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз повторить набор запросов'
+        )
+
+    def handle(self, *args, **options):
+        names = list(Ingredient.objects.values_list('name', flat=True)[:50])
+        if not names:
+            self.stdout.write(self.style.ERROR('Нет ингредиентов в базе.'))
+            return
+        queries = [
+            name[:length] for name in names for length in (1, 2, 3, 5)
+        ]
+        ingredient_index.refresh()
+        results = {
+            'orm icontains': measure(
+                lambda query: list(Ingredient.objects.filter(
+                    name__icontains=query
+                ).values('id', 'name', 'measurement_unit')),
+                queries, options['repeat']
+            ),
+            'index': measure(
+                ingredient_index.search, queries, options['repeat']
+            ),
+        }
+        for method, (p50, p99) in results.items():
+            self.stdout.write(
+                f'{method:<15} p50={p50:.3f}ms p99={p99:.3f}ms'
+            )
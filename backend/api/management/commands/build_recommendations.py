@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.constants import RECOMMENDATIONS_MAX_USER_ITEMS, RECOMMENDATIONS_TOP_K
+from api.recommendations import rebuild_similarities
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает похожие рецепты по избранному и спискам покупок '
+        'для эндпоинта /api/recipes/recommended/. Запускается '
+        'периодически, например из cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k', type=int, default=RECOMMENDATIONS_TOP_K,
+            help='Сколько похожих рецептов хранить для каждого рецепта'
+        )
+        parser.add_argument(
+            '--max-user-items', type=int,
+            default=RECOMMENDATIONS_MAX_USER_ITEMS,
+            help=(
+                'Не учитывать пользователей, у которых больше '
+                'рецептов в избранном и списке покупок'
+            )
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_similarities(
+            top_k=options['top_k'], max_user_items=options['max_user_items']
+        )
+        self.stdout.write(
+            f'Сохранено пар похожих рецептов: {count} '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
@@ -0,0 +1,125 @@
+import os
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from api.constants import IMAGE_RENDITIONS
+from api.storage import get_media_names
+from recipes.counters import recount_media_references
+from recipes.models import MediaFile, Recipe, User
+
+MEDIA_FIELDS = (
+    (Recipe, 'image', 'image_renditions'),
+    (User, 'avatar', 'avatar_renditions'),
+)
+
+
+def iter_media_files(root, prefix=''):
+    """Yield (name, DirEntry) for every file under root, lazily."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            name = f'{prefix}{entry.name}'
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_media_files(entry.path, f'{name}/')
+            elif entry.is_file(follow_symlinks=False):
+                yield name, entry
+
+
+def get_referenced_names(names):
+    """Names still stored in an image or renditions field.
+
+    Rows written by bulk_create or QuerySet.update bypass the signals
+    that count references, so the fields have the final word.
+    """
+    referenced = set()
+    for model, field, renditions_field in MEDIA_FIELDS:
+        query = Q(**{f'{field}__in': names})
+        for rendition in IMAGE_RENDITIONS:
+            query |= Q(**{f'{renditions_field}__{rendition}__in': names})
+        for name, renditions in model.objects.filter(query).values_list(
+            field, renditions_field
+        ):
+            referenced |= get_media_names(
+                {field: name, renditions_field: renditions or {}}
+            )
+    return referenced & set(names)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из MEDIA_ROOT файлы, на которые не ссылается ни один '
+        'рецепт или пользователь.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено'
+        )
+        parser.add_argument(
+            '--grace-minutes', type=int, default=60,
+            help='Не удалять файлы, измененные за это число минут'
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='Пересчитать ссылки на файлы перед удалением'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            referenced = recount_media_references(MediaFile, Recipe, User)
+            self.stdout.write(f'Файлов со ссылками: {referenced}')
+        cutoff = time.time() - options['grace_minutes'] * 60
+        kept = removed = freed = uncounted = 0
+        for batch in batched(
+            iter_media_files(settings.MEDIA_ROOT), options['batch_size']
+        ):
+            referenced = set(MediaFile.objects.filter(
+                name__in=[name for name, _ in batch], references__gt=0
+            ).values_list('name', flat=True))
+            candidates = []
+            for name, entry in batch:
+                stat = entry.stat(follow_symlinks=False)
+                if name in referenced or stat.st_mtime > cutoff:
+                    kept += 1
+                else:
+                    candidates.append((name, entry, stat.st_size))
+            if not candidates:
+                continue
+            in_use = get_referenced_names(
+                [name for name, _, _ in candidates]
+            )
+            kept += len(in_use)
+            uncounted += len(in_use)
+            orphans = []
+            for name, entry, size in candidates:
+                if name in in_use:
+                    continue
+                orphans.append(name)
+                freed += size
+                if options['dry_run']:
+                    self.stdout.write(name)
+                else:
+                    os.remove(entry.path)
+            removed += len(orphans)
+            if orphans and not options['dry_run']:
+                MediaFile.objects.filter(name__in=orphans).delete()
+        self.stdout.write(
+            f'Оставлено: {kept}, удалено: {removed}, '
+            f'освобождено {freed / 1024 / 1024:.1f} МБ'
+        )
+        if uncounted:
+            self.stdout.write(self.style.WARNING(
+                f'Используются, но не учтены в MediaFile: {uncounted}. '
+                f'Запустите команду с --recount.'
+            ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from api.images import process_renditions
+from recipes.models import Recipe, User
+
+IMAGE_FIELDS = (
+    (Recipe, 'image', 'image_renditions'),
+    (User, 'avatar', 'avatar_renditions'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает уменьшенные копии изображений рецептов и аватаров, '
+        'у которых их еще нет.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии для всех изображений'
+        )
+
+    def handle(self, *args, **options):
+        for model, field, renditions_field in IMAGE_FIELDS:
+            queryset = model.objects.exclude(**{field: ''}).exclude(
+                **{f'{field}__isnull': True}
+            )
+            if not options['all']:
+                queryset = queryset.filter(**{renditions_field: {}})
+            pks = list(queryset.values_list('pk', flat=True))
+            for pk in pks:
+                process_renditions(model, pk, field, renditions_field)
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {len(pks)}'
+            )
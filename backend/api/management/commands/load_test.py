@@ -0,0 +1,101 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response, return status and keep-alive flag."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip().lower()
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection') != 'close'
+
+
+async def client(url, deadline, timings, errors):
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    request = (
+        f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n'
+        f'Connection: keep-alive\r\n\r\n'
+    ).encode()
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(
+                    parts.hostname, parts.port or 80
+                )
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            errors.append('connection')
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        timings.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(status)
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, concurrency, duration):
+    timings, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        client(url, deadline, timings, errors) for _ in range(concurrency)
+    ))
+    return timings, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест: множество одновременных клиентов запрашивают '
+        'URL, выводятся пропускная способность и задержки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', type=str, help='Полный URL запроса')
+        parser.add_argument('--concurrency', type=int, default=500)
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность теста в секундах'
+        )
+
+    def handle(self, *args, **options):
+        if not options['url'].startswith('http://'):
+            raise CommandError('Поддерживаются только http:// URL.')
+        timings, errors = asyncio.run(run(
+            options['url'], options['concurrency'], options['duration']
+        ))
+        if not timings:
+            raise CommandError('Ни один запрос не выполнен.')
+        timings.sort()
+        self.stdout.write(
+            f'запросов: {len(timings)}, ошибок: {len(errors)}, '
+            f'{len(timings) / options["duration"]:.1f} запросов/с, '
+            f'p50={statistics.median(timings) * 1000:.1f}мс '
+            f'p99={timings[int(len(timings) * 0.99) - 1] * 1000:.1f}мс'
+        )
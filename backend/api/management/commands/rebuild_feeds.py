@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.feeds import rebuild_feeds, trim_feeds
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет ленты подписок заново по текущим подпискам. '
+        'С --trim только удаляет из лент записи сверх лимита '
+        '(удобно запускать по расписанию).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trim', action='store_true',
+            help='Только обрезать ленты до лимита'
+        )
+
+    def handle(self, *args, **options):
+        if options['trim']:
+            self.stdout.write(f'Удалено записей: {trim_feeds()}')
+            return
+        with transaction.atomic():
+            created = rebuild_feeds() - trim_feeds()
+        self.stdout.write(f'Записей в лентах: {created}')
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import time
+from contextvars import ContextVar
+
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from api.profiling import get_view_name
+
+REQUEST_LATENCY = Histogram(
+    'foodgram_request_duration_seconds',
+    'Request latency by view action.',
+    ['view', 'method', 'status'],
+)
+DB_QUERIES = Counter(
+    'foodgram_db_queries_total',
+    'Database queries executed by view action.',
+    ['view'],
+)
+DB_QUERY_DURATION = Counter(
+    'foodgram_db_query_duration_seconds_total',
+    'Time spent in the database by view action.',
+    ['view'],
+)
+CACHE_REQUESTS = Counter(
+    'foodgram_cache_requests_total',
+    'Reference data cache lookups.',
+    ['namespace', 'result'],
+)
+
+
+current_queries = ContextVar('current_queries', default=None)
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+def count_queries(execute, sql, params, many, context):
+    """Execute wrapper feeding the QueryCounter of the current request.
+
+    The counter lives in a context variable, so queries are attributed
+    correctly when the view runs in a sync_to_async worker thread.
+    """
+    counter = current_queries.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        counter.duration += time.perf_counter() - start
+        counter.count += 1
+
+
+def install_query_counter(sender, connection, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+class MetricsMiddleware:
+    """Observe latency and database usage for every DRF action.
+
+    Works both under WSGI and ASGI without forcing the middleware chain
+    into synchronous mode.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Same marker Django's MiddlewareMixin uses.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        counter, token, start = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_queries.reset(token)
+        self.observe(request, response, counter, start)
+        return response
+
+    async def __acall__(self, request):
+        counter, token, start = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_queries.reset(token)
+        self.observe(request, response, counter, start)
+        return response
+
+    def start(self, request):
+        request.metrics_view = 'unmatched'
+        counter = QueryCounter()
+        return counter, current_queries.set(counter), time.perf_counter()
+
+    def observe(self, request, response, counter, start):
+        view = request.metrics_view
+        REQUEST_LATENCY.labels(
+            view, request.method, response.status_code
+        ).observe(time.perf_counter() - start)
+        DB_QUERIES.labels(view).inc(counter.count)
+        DB_QUERY_DURATION.labels(view).inc(counter.duration)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = get_view_name(request, view_func)
+
+
+def metrics_view(request):
+    """Prometheus exposition, aggregated over gunicorn workers.
+
+    With PROMETHEUS_MULTIPROC_DIR set every worker writes its samples
+    to mmap files in that directory and they are merged here.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(
+        generate_latest(registry), content_type=CONTENT_TYPE_LATEST
+    )
@@ -1,5 +1,130 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (
+    LimitOffsetPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.feeds import get_feed_positions
 
 
 class NoPagination(PageNumberPagination):
     page_size = None
+
+
+class RecipePagination(LimitOffsetPagination):
+    """Limit/offset pagination with an opt-in keyset (cursor) mode.
+
+    Passing ?cursor= (empty for the first page) switches to keyset
+    pagination over (pub_date, id): no COUNT(*) and no OFFSET, so deep
+    pages cost the same as the first one.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    # Keyset pages follow (pub_date, id); any other order would be
+    # silently replaced, so it is rejected instead.
+    cursor_conflicting_params = {'search': None, 'ordering': 'pub_date'}
+    cursor_conflict_message = (
+        'Cursor pagination cannot be combined with {param}.'
+    )
+    cursor_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.check_cursor_params(request)
+        self.request = request
+        self.limit = self.get_limit(request)
+        queryset = queryset.order_by('pub_date', 'id')
+        position = self.decode_cursor(request)
+        if position is not None:
+            pub_date, pk = position
+            queryset = queryset.filter(
+                Q(pub_date__gte=pub_date)
+                & (Q(pub_date__gt=pub_date) | Q(id__gt=pk))
+            )
+        results = list(queryset[:self.limit + 1])
+        self.next_position = None
+        if len(results) > self.limit:
+            results = results[:self.limit]
+            self.next_position = (results[-1].pub_date, results[-1].pk)
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_cursor_link()),
+            ('previous', None),
+            ('results', data)
+        ]))
+
+    def check_cursor_params(self, request):
+        for param, allowed in self.cursor_conflicting_params.items():
+            value = request.query_params.get(param)
+            if value and value != allowed:
+                raise ValidationError({self.cursor_query_param: [
+                    self.cursor_conflict_message.format(param=param)
+                ]})
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            pub_date, pk = base64.urlsafe_b64decode(
+                encoded.encode()
+            ).decode().split('|')
+            return datetime.fromisoformat(pub_date), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        pub_date, pk = position
+        return base64.urlsafe_b64encode(
+            f'{pub_date.isoformat()}|{pk}'.encode()
+        ).decode()
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.offset_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param,
+            self.encode_cursor(self.next_position)
+        )
+
+
+class FeedPagination(RecipePagination):
+    """Keyset pagination over the user's feed, newest recipes first.
+
+    Always in cursor mode; the page is selected from the timeline by
+    (pub_date, id) and only its recipes are loaded from the queryset.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = True
+        self.request = request
+        self.limit = self.get_limit(request)
+        positions = get_feed_positions(
+            request.user, self.decode_cursor(request), self.limit + 1
+        )
+        self.next_position = None
+        if len(positions) > self.limit:
+            positions = positions[:self.limit]
+            self.next_position = positions[-1]
+        ranks = {pk: rank for rank, (_, pk) in enumerate(positions)}
+        return sorted(
+            queryset.filter(pk__in=ranks),
+            key=lambda recipe: ranks[recipe.pk]
+        )
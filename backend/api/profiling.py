@@ -0,0 +1,137 @@
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib import admin
+from django.db import connections
+from django.shortcuts import render
+
+logger = logging.getLogger('api.profiling')
+
+slow_requests = deque(maxlen=settings.SQL_PROFILING_BUFFER_SIZE)
+
+PLACEHOLDER_LIST = re.compile(r'%s(\s*,\s*%s)+')
+
+
+def fingerprint(sql):
+    """Collapse IN (...) lists so equal queries share one fingerprint."""
+    return PLACEHOLDER_LIST.sub('%s, ...', sql)
+
+
+def get_view_name(request, view_func):
+    """Return 'ViewSet.action' for DRF viewsets, the function name else."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__qualname__', repr(view_func))
+    action = getattr(view_func, 'actions', {}).get(request.method.lower())
+    if action:
+        return f'{view_class.__name__}.{action}'
+    return view_class.__name__
+
+
+class QueryCollector:
+    """Database execute wrapper which times every query."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+
+class SQLProfilingMiddleware:
+    """Per-request SQL statistics for the API.
+
+    Adds a Server-Timing header, writes one JSON line to the
+    'api.profiling' logger per request and keeps a sample of slow
+    requests in an in-process ring buffer shown in the admin.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = QueryCollector()
+        request.profiling = {'collector': collector}
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(collector)
+                )
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+        self.record(request, response, collector, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profiling = request.profiling
+        profiling['view'] = get_view_name(request, view_func)
+        profiling['view_start'] = time.perf_counter()
+        profiling['view_db_start'] = profiling['collector'].duration
+
+    def process_template_response(self, request, response):
+        profiling = request.profiling
+        if 'view_start' in profiling:
+            # DRF serializes inside the view, so this is view code and
+            # serializers without the time spent in SQL.
+            profiling['serializer'] = (
+                time.perf_counter() - profiling['view_start']
+                - (profiling['collector'].duration
+                   - profiling['view_db_start'])
+            )
+        return response
+
+    def record(self, request, response, collector, total):
+        duplicates = {
+            sql: count for sql, count in collector.fingerprints.items()
+            if count > 1
+        }
+        record = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': request.profiling.get('view'),
+            'status': response.status_code,
+            'queries': collector.count,
+            'db_ms': round(collector.duration * 1000, 3),
+            'serializer_ms': round(
+                request.profiling.get('serializer', 0) * 1000, 3
+            ),
+            'total_ms': round(total * 1000, 3),
+            'duplicates': duplicates,
+        }
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={record["db_ms"]};desc="{collector.count} queries"',
+            f'serializer;dur={record["serializer_ms"]}',
+            f'total;dur={record["total_ms"]}',
+        ])
+        slow = record['total_ms'] >= settings.SQL_PROFILING_SLOW_MS
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            json.dumps(record, ensure_ascii=False)
+        )
+        if slow and random.random() < settings.SQL_PROFILING_SAMPLE_RATE:
+            record['time'] = time.time()
+            slow_requests.append(record)
+
+
+def slow_requests_view(request):
+    return render(request, 'admin/slow_requests.html', {
+        **admin.site.each_context(request),
+        'title': 'Slow requests',
+        'requests': reversed(slow_requests),
+        'threshold': settings.SQL_PROFILING_SLOW_MS,
+    })
@@ -0,0 +1,125 @@
+import heapq
+import math
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from api.constants import (
+    RECOMMENDATIONS_CART_WEIGHT,
+    RECOMMENDATIONS_FAVORITE_WEIGHT,
+    RECOMMENDATIONS_MAX_USER_ITEMS,
+    RECOMMENDATIONS_TOP_K,
+)
+from recipes.models import Favorite, RecipeSimilarity, ShoppingList
+
+INTERACTIONS_CHUNK_SIZE = 10000
+SIMILARITIES_BATCH_SIZE = 5000
+
+
+def load_interactions():
+    """Build the sparse user x recipe matrix from favorites and carts.
+
+    Returns the matrix twice, by recipe and by user, as dicts of
+    {id: weight}. A favorite outweighs the same recipe in the cart.
+    """
+    users_by_recipe = defaultdict(dict)
+    recipes_by_user = defaultdict(dict)
+    sources = (
+        (ShoppingList, RECOMMENDATIONS_CART_WEIGHT),
+        (Favorite, RECOMMENDATIONS_FAVORITE_WEIGHT),
+    )
+    for model, weight in sources:
+        rows = model.objects.values_list('user', 'recipes').iterator(
+            chunk_size=INTERACTIONS_CHUNK_SIZE
+        )
+        for user_id, recipe_id in rows:
+            value = max(weight, recipes_by_user[user_id].get(recipe_id, 0))
+            users_by_recipe[recipe_id][user_id] = value
+            recipes_by_user[user_id][recipe_id] = value
+    return users_by_recipe, recipes_by_user
+
+
+def iter_neighbors(users_by_recipe, recipes_by_user, top_k=None,
+                   max_user_items=None):
+    """Yield (recipe_id, [(score, similar_id), ...]) by cosine similarity.
+
+    Rows of the co-occurrence matrix are computed one recipe at a time
+    as a sparse product (recipe -> its users -> their recipes), so only
+    non-zero cells are visited and memory stays O(interactions) plus a
+    single row. Users with more than max_user_items recipes are skipped
+    as co-occurrence evidence: they add quadratic work and little signal.
+    They are left out of the norms too, so scores stay cosine.
+    """
+    top_k = top_k or RECOMMENDATIONS_TOP_K
+    max_user_items = max_user_items or RECOMMENDATIONS_MAX_USER_ITEMS
+    counted = {
+        user_id for user_id, recipes in recipes_by_user.items()
+        if len(recipes) <= max_user_items
+    }
+    norms = {
+        recipe_id: math.sqrt(sum(
+            weight * weight for user_id, weight in users.items()
+            if user_id in counted
+        ))
+        for recipe_id, users in users_by_recipe.items()
+    }
+    for recipe_id, users in users_by_recipe.items():
+        dot = defaultdict(float)
+        for user_id, weight in users.items():
+            if user_id not in counted:
+                continue
+            for other_id, other_weight in recipes_by_user[user_id].items():
+                dot[other_id] += weight * other_weight
+        dot.pop(recipe_id, None)
+        if not dot:
+            continue
+        norm = norms[recipe_id]
+        yield recipe_id, heapq.nlargest(top_k, (
+            (value / (norm * norms[other_id]), other_id)
+            for other_id, value in dot.items()
+        ))
+
+
+def rebuild_similarities(top_k=None, max_user_items=None):
+    """Replace the RecipeSimilarity table with freshly computed neighbors.
+
+    Neighbors are computed before the transaction is opened and the swap
+    is a delete plus batched inserts, so the table is locked only for
+    the writes and readers see the previous neighbors until the commit.
+    """
+    neighbors = iter_neighbors(
+        *load_interactions(), top_k=top_k, max_user_items=max_user_items
+    )
+    rows = [
+        RecipeSimilarity(recipe_id=recipe_id, similar_id=similar_id,
+                         score=score)
+        for recipe_id, similar in neighbors
+        for score, similar_id in similar
+    ]
+    with transaction.atomic():
+        RecipeSimilarity.objects.all().delete()
+        RecipeSimilarity.objects.bulk_create(
+            rows, batch_size=SIMILARITIES_BATCH_SIZE
+        )
+    return len(rows)
+
+
+def get_recommendations(user, limit):
+    """Return [(recipe_id, score), ...] for the user's favorites and cart.
+
+    One query over the materialized neighbors of every seed recipe:
+    scores of a candidate are summed across seeds and recipes the user
+    already has are excluded.
+    """
+    favorites = Favorite.objects.filter(user=user).values('recipes')
+    shopping_cart = ShoppingList.objects.filter(user=user).values('recipes')
+    return list(RecipeSimilarity.objects.filter(
+        Q(recipe__in=favorites) | Q(recipe__in=shopping_cart)
+    ).exclude(
+        Q(similar__in=favorites) | Q(similar__in=shopping_cart)
+    ).values('similar').annotate(
+        total_score=Sum('score')
+    ).order_by('-total_score', 'similar_id').values_list(
+        'similar', 'total_score'
+    )[:limit])
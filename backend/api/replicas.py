@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+current_routing = ContextVar('current_routing', default=None)
+
+
+def get_sticky_key(request):
+    """Cache key identifying the client that made the request.
+
+    Built from the auth token or the session cookie, so it is known
+    before DRF authenticates the request and needs no query.
+    """
+    credentials = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credentials:
+        return None
+    digest = hashlib.sha256(credentials.encode()).hexdigest()
+    return f'replica-sticky:{digest}'
+
+
+class Routing:
+
+    def __init__(self, request):
+        self.sticky_key = get_sticky_key(request)
+        self.database = 'default'
+        if request.method in SAFE_METHODS and not (
+            self.sticky_key and cache.get(self.sticky_key)
+        ):
+            self.database = random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaRouter:
+    """Send reads of safe requests to a replica, everything else to
+    the primary.
+
+    Reads outside a request (management commands, signals fired by
+    scripts) and every read of a write request stay on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        if routing is None:
+            return 'default'
+        return routing.database
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """Pick the database for the request and keep clients on the
+    primary for REPLICA_STICKY_SECONDS after a successful write, so
+    they read their own favorites, carts and subscriptions despite
+    replication lag.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Same marker Django's MiddlewareMixin uses.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        routing = Routing(request)
+        token = current_routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        self.mark_sticky(request, response, routing)
+        return response
+
+    async def __acall__(self, request):
+        routing = Routing(request)
+        token = current_routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        self.mark_sticky(request, response, routing)
+        return response
+
+    def mark_sticky(self, request, response, routing):
+        if (
+            routing.sticky_key
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            cache.set(
+                routing.sticky_key, True, settings.REPLICA_STICKY_SECONDS
+            )
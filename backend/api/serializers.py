@@ -1,9 +1,13 @@
-from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db import transaction
 from djoser.serializers import UserCreateSerializer
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
+from .constants import BULK_MAX_RECIPES
+from .feeds import fan_out_recipe
+from .fields import StreamingBase64ImageField
+from .images import schedule_renditions
+from .utils import get_recipes_limit
 from .validators import cooking_time_validator
 from recipes.models import (
     User,
@@ -17,6 +21,28 @@ from recipes.models import (
 )
 
 
+def to_id(value):
+    """Return value as a primary key, None if it is not one."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RenditionsField(serializers.ReadOnlyField):
+    """Map of rendition name to URL, empty while still being rendered."""
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        renditions = {}
+        for rendition, name in (value or {}).items():
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            renditions[rendition] = url
+        return renditions
+
+
 class CreatetUserSerializer(UserCreateSerializer):
 
     class Meta:
@@ -30,6 +56,7 @@ class CreatetUserSerializer(UserCreateSerializer):
 
 class UserSerializer(UserCreateSerializer):
     is_subscribed = serializers.SerializerMethodField()
+    avatar_renditions = RenditionsField()
 
     def get_is_subscribed(self, obj):
         return getattr(obj, 'is_subscribed', False)
@@ -38,13 +65,14 @@ class UserSerializer(UserCreateSerializer):
         model = User
         fields = [
             'id', 'email', 'username', 'first_name',
-            'last_name', 'avatar', 'password', 'is_subscribed'
+            'last_name', 'avatar', 'avatar_renditions', 'password',
+            'is_subscribed', 'subscribers_count', 'recipes_count'
         ]
         required_fields = ['username', 'first_name', 'last_name']
 
 
 class AvatarSerializer(serializers.ModelSerializer):
-    avatar = Base64ImageField(required=True)
+    avatar = StreamingBase64ImageField(required=True)
 
     def validate_avatar(self, attrs):
         if not attrs:
@@ -52,9 +80,11 @@ class AvatarSerializer(serializers.ModelSerializer):
         return attrs
 
     def update(self, instance, validated_data):
-        avatar_data = validated_data.get('avatar', None)
-        file = ContentFile(avatar_data.read())
-        instance.avatar.save('image.png', file, save=True)
+        avatar = validated_data['avatar']
+        instance.avatar_renditions = {}
+        instance.avatar.save(avatar.name, avatar, save=False)
+        instance.save(update_fields=['avatar', 'avatar_renditions'])
+        schedule_renditions(instance, 'avatar', 'avatar_renditions')
         return instance
 
     class Meta:
@@ -98,19 +128,23 @@ class RecipeGetSerializer(serializers.ModelSerializer):
     tags = TagSerializer(read_only=True, many=True)
     is_favorited = serializers.BooleanField(default=False)
     is_in_shopping_cart = serializers.BooleanField(default=False)
+    image_renditions = RenditionsField()
 
     def get_ingredients(self, obj):
-        return IngredientAmountSerializer(
-            IngredientAmount.objects.filter(recipe=obj), many=True
-        ).data
+        ingredient_amounts = getattr(obj, 'ingredient_amounts', None)
+        if ingredient_amounts is None:
+            ingredient_amounts = obj.ingredientamount_set.select_related(
+                'ingredient'
+            )
+        return IngredientAmountSerializer(ingredient_amounts, many=True).data
 
     class Meta:
         model = Recipe
-        exclude = ['short_link', 'pub_date']
+        exclude = ['pub_date', 'search_vector']
 
 
 class RecipeWriteSerializer(RecipeGetSerializer):
-    image = Base64ImageField(required=True)
+    image = StreamingBase64ImageField(required=True)
     cooking_time = serializers.IntegerField(
         required=True,
         validators=[cooking_time_validator]
@@ -125,8 +159,7 @@ class RecipeWriteSerializer(RecipeGetSerializer):
             raise serializers.ValidationError(
                 {'ingredients': ['Обязательное поле.']}
             )
-        unique_ingredients = set()
-        new_ingredients_data = []
+        amounts = {}
         for ingredient_data in ingredients_data:
             if not ingredient_data.get('amount'):
                 raise serializers.ValidationError(
@@ -136,53 +169,52 @@ class RecipeWriteSerializer(RecipeGetSerializer):
                 raise serializers.ValidationError(
                     {'id': ['Обязательное поле.']}
                 )
-            if ingredient_data['id'] in unique_ingredients:
+            ingredient_id = to_id(ingredient_data['id'])
+            if ingredient_id is None:
+                raise serializers.ValidationError(
+                    {'ingredients': ['Несуществующий ингредиент.']}
+                )
+            if ingredient_id in amounts:
                 raise serializers.ValidationError(
                     {'ingredients': ['Повторяющееся значение.']}
                 )
             try:
-                if int(ingredient_data.get('amount')) <= 0:
-                    raise serializers.ValidationError(
-                        {'amount': ['Должно быть больше 0.']}
-                    )
-            except ValueError:
+                amount = int(ingredient_data.get('amount'))
+            except (TypeError, ValueError):
                 raise serializers.ValidationError(
                     {'amount': ['Значение должно быть целым числом.']}
                 )
-            unique_ingredients.add(ingredient_data['id'])
-        try:
-            ingredients = Ingredient.objects.filter(id__in=unique_ingredients)
-            for ingredient in ingredients_data:
-                new_ingredients_data.append(
-                    {
-                        'ingredient': ingredients.get(pk=ingredient['id']),
-                        'amount': ingredient['amount']
-                    }
+            if amount <= 0:
+                raise serializers.ValidationError(
+                    {'amount': ['Должно быть больше 0.']}
                 )
-        except Ingredient.DoesNotExist:
+            amounts[ingredient_id] = amount
+        ingredients = Ingredient.objects.in_bulk(list(amounts))
+        if len(ingredients) != len(amounts):
             raise serializers.ValidationError(
                 {'ingredients': ['Несуществующий ингредиент.']}
             )
-        new_tags_data = []
         if not tags_data:
             raise serializers.ValidationError(
                 {'tags': ['Обязательное поле.']}
             )
-        for tag_data in tags_data:
-            try:
-                tag = Tag.objects.get(pk=tag_data)
-                if tag in new_tags_data:
-                    raise serializers.ValidationError(
-                        {'tags': ['Повторяющееся значение.']}
-                    )
-                else:
-                    new_tags_data.append(tag)
-            except Tag.DoesNotExist:
-                raise serializers.ValidationError(
-                    {'Tag': ['Несуществующий тег.']}
-                )
-        data['ingredients'] = new_ingredients_data
-        data['tags'] = new_tags_data
+        tag_ids = [to_id(tag_data) for tag_data in tags_data]
+        if len(set(tag_ids)) != len(tag_ids):
+            raise serializers.ValidationError(
+                {'tags': ['Повторяющееся значение.']}
+            )
+        tags = Tag.objects.in_bulk(
+            [tag_id for tag_id in tag_ids if tag_id is not None]
+        )
+        if len(tags) != len(tag_ids):
+            raise serializers.ValidationError(
+                {'Tag': ['Несуществующий тег.']}
+            )
+        data['ingredients'] = [
+            {'ingredient': ingredients[ingredient_id], 'amount': amount}
+            for ingredient_id, amount in amounts.items()
+        ]
+        data['tags'] = [tags[tag_id] for tag_id in tag_ids]
         return data
 
     def validate_image(self, value):
@@ -216,14 +248,59 @@ class RecipeWriteSerializer(RecipeGetSerializer):
         recipe = Recipe.objects.create(**validated_data)
         self.create_ingredients(ingredients_data, recipe)
         recipe.tags.set(tags_data)
+        fan_out_recipe(recipe)
+        schedule_renditions(recipe, 'image', 'image_renditions')
         return recipe
 
+    def update_ingredients(self, data, recipe):
+        """Apply only the difference to the recipe's ingredient amounts."""
+        current = getattr(recipe, 'ingredient_amounts', None)
+        if current is None:
+            current = recipe.ingredientamount_set.all()
+        current = {
+            ingredient_amount.ingredient_id: ingredient_amount
+            for ingredient_amount in current
+        }
+        to_create = []
+        to_update = []
+        for ingredient_data in data:
+            ingredient_amount = current.pop(
+                ingredient_data['ingredient'].id, None
+            )
+            if ingredient_amount is None:
+                to_create.append(ingredient_data)
+            elif ingredient_amount.amount != ingredient_data['amount']:
+                ingredient_amount.amount = ingredient_data['amount']
+                to_update.append(ingredient_amount)
+        if current:
+            IngredientAmount.objects.filter(
+                id__in=[
+                    ingredient_amount.id
+                    for ingredient_amount in current.values()
+                ]
+            ).delete()
+        if to_update:
+            IngredientAmount.objects.bulk_update(to_update, ['amount'])
+        if to_create:
+            self.create_ingredients(to_create, recipe)
+
     @transaction.atomic
     def update(self, instance, validated_data):
-        instance.ingredients.clear()
+        validated_data.pop('is_favorited', None)
+        validated_data.pop('is_in_shopping_cart', None)
         instance.tags.set(validated_data.pop('tags'))
-        self.create_ingredients(validated_data.pop('ingredients'), instance)
-        return super().update(instance, validated_data)
+        self.update_ingredients(validated_data.pop('ingredients'), instance)
+        if hasattr(instance, 'ingredient_amounts'):
+            del instance.ingredient_amounts
+        if 'image' in validated_data:
+            validated_data['image_renditions'] = {}
+            schedule_renditions(instance, 'image', 'image_renditions')
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        # Counters are shifted concurrently with F(); write back only the
+        # edited columns.
+        instance.save(update_fields=list(validated_data))
+        return instance
 
 
 class UserWithRecipeSerializer(serializers.Serializer):
@@ -232,30 +309,26 @@ class UserWithRecipeSerializer(serializers.Serializer):
     username = serializers.CharField()
     first_name = serializers.CharField()
     last_name = serializers.CharField()
-    avatar = Base64ImageField()
+    avatar = StreamingBase64ImageField()
+    avatar_renditions = RenditionsField()
     is_subscribed = serializers.BooleanField(default=False)
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.IntegerField(read_only=True)
 
     def get_recipes(self, obj):
-        recipes_limit = self.context['request'].query_params.get(
-            'recipes_limit', None
-        )
-        if recipes_limit:
-            recipes = Recipe.objects.filter(
-                author=obj
-            )[:int(recipes_limit)]
-        else:
+        recipes = getattr(obj, 'recipes_preview', None)
+        if recipes is None:
             recipes = Recipe.objects.filter(author=obj)
+            recipes_limit = get_recipes_limit(self.context['request'])
+            if recipes_limit is not None:
+                recipes = recipes[:recipes_limit]
         return ShortRecipeSerializer(recipes, many=True).data
 
-    def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj).count()
-
     class Meta:
         fields = [
             'id', 'email', 'username', 'first_name', 'last_name',
-            'avatar', 'is_subscribed', 'recipes', 'recipes_count'
+            'avatar', 'avatar_renditions', 'is_subscribed', 'recipes',
+            'recipes_count'
         ]
 
 
@@ -307,18 +380,20 @@ class SubscriptionSerializer(serializers.ModelSerializer):
 class ShortRecipeSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField()
     name = serializers.CharField()
-    image = Base64ImageField()
+    image = StreamingBase64ImageField()
+    image_renditions = RenditionsField()
     cooking_time = serializers.IntegerField()
 
     class Meta:
         model = Recipe
         fields = [
-            'id', 'name', 'image', 'cooking_time'
+            'id', 'name', 'image', 'image_renditions', 'cooking_time'
         ]
 
 
 class ShoppingListSerializer(serializers.ModelSerializer):
     recipes = RecipeGetSerializer(read_only=True)
+    already_added_message = 'Recipe is already in a shopping cart'
 
     def validate(self, data):
         request = self.context['request']
@@ -337,14 +412,22 @@ class ShoppingListSerializer(serializers.ModelSerializer):
             ).exists()
         ):
             raise serializers.ValidationError(
-                {
-                    'recipes': [
-                        'Recipe is already in a shopping cart'
-                    ]
-                }
+                {'recipes': [self.already_added_message]}
             )
         return data
 
+    def create(self, validated_data):
+        # A concurrent request may add the recipe after validate(); the
+        # unique constraint decides and the loser gets the same 400.
+        instance, created = self.Meta.model.objects.get_or_create(
+            **validated_data
+        )
+        if not created:
+            raise serializers.ValidationError(
+                {'recipes': [self.already_added_message]}
+            )
+        return instance
+
     def to_representation(self, instance):
         return ShortRecipeSerializer(
             instance.recipes, context=self.context
@@ -356,7 +439,28 @@ class ShoppingListSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'recipes']
 
 
+class RecipeBulkSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_MAX_RECIPES
+    )
+
+    def validate_recipes(self, value):
+        ids = set(value)
+        existing = set(
+            Recipe.objects.filter(id__in=ids).values_list('id', flat=True)
+        )
+        missing = ids - existing
+        if missing:
+            raise serializers.ValidationError(
+                f'Recipes do not exist: {sorted(missing)}'
+            )
+        return sorted(ids)
+
+
 class FavoriteSerializer(ShoppingListSerializer):
+    already_added_message = 'Recipe is already favorited'
 
     def validate(self, data):
         request = self.context['request']
@@ -375,11 +479,7 @@ class FavoriteSerializer(ShoppingListSerializer):
             ).exists()
         ):
             raise serializers.ValidationError(
-                {
-                    'recipes': [
-                        'Recipe is already favorited'
-                    ]
-                }
+                {'recipes': [self.already_added_message]}
             )
         return data
 
@@ -0,0 +1,165 @@
+import atexit
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.http import Http404, HttpResponseRedirect
+
+from api import base62
+from api.constants import (SHORT_LINK_CACHE_TIMEOUT,
+                           SHORT_LINK_FLUSH_INTERVAL,
+                           SHORT_LINK_FLUSH_SIZE,
+                           SHORT_LINK_LOCAL_SIZE,
+                           SHORT_LINK_LOCAL_TIMEOUT)
+from recipes.models import Recipe
+
+
+def get_cache_key(recipe_id):
+    return f'short-link:{recipe_id}'
+
+
+class RecipeIdCache:
+    """Ids of existing recipes, kept in a per-process LRU in front of
+    the shared cache.
+
+    Local entries expire after SHORT_LINK_LOCAL_TIMEOUT seconds, which
+    bounds how long other processes keep redirecting to a deleted
+    recipe.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, recipe_id):
+        with self.lock:
+            expires = self.entries.get(recipe_id)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self.entries[recipe_id]
+                return False
+            self.entries.move_to_end(recipe_id)
+            return True
+
+    def add(self, recipe_id):
+        with self.lock:
+            self.entries[recipe_id] = time.monotonic() + self.timeout
+            self.entries.move_to_end(recipe_id)
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def discard(self, recipe_id):
+        with self.lock:
+            self.entries.pop(recipe_id, None)
+
+
+recipe_ids = RecipeIdCache(SHORT_LINK_LOCAL_SIZE, SHORT_LINK_LOCAL_TIMEOUT)
+
+
+def recipe_exists(recipe_id):
+    if recipe_ids.get(recipe_id):
+        return True
+    key = get_cache_key(recipe_id)
+    if not cache.get(key):
+        if not Recipe.objects.filter(pk=recipe_id).exists():
+            return False
+        cache.set(key, True, SHORT_LINK_CACHE_TIMEOUT)
+    recipe_ids.add(recipe_id)
+    return True
+
+
+def forget_recipe(recipe_id):
+    recipe_ids.discard(recipe_id)
+    cache.delete(get_cache_key(recipe_id))
+
+
+class ClickBuffer:
+    """Count short link clicks in memory and write them in batches.
+
+    A flush happens once SHORT_LINK_FLUSH_SIZE clicks are pending, at
+    the latest SHORT_LINK_FLUSH_INTERVAL seconds after the first pending
+    click (a timer thread covers quiet workers), and at process exit.
+    """
+
+    def __init__(self, size, interval):
+        self.size = size
+        self.interval = interval
+        self.clicks = Counter()
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def add(self, recipe_id):
+        with self.lock:
+            self.clicks[recipe_id] += 1
+            self.pending += 1
+            if (
+                self.pending < self.size
+                and time.monotonic() - self.flushed_at < self.interval
+            ):
+                if self.timer is None:
+                    self.timer = threading.Timer(
+                        self.interval, self.flush_in_thread
+                    )
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+            clicks = self.take()
+        self.write(clicks)
+
+    def flush(self):
+        with self.lock:
+            clicks = self.take()
+        self.write(clicks)
+
+    def flush_in_thread(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread has its own connection; do not leak it.
+            connection.close()
+
+    def take(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        clicks, self.clicks = self.clicks, Counter()
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+        return clicks
+
+    @staticmethod
+    def write(clicks):
+        # One UPDATE per distinct increment instead of one per recipe.
+        recipes_by_delta = defaultdict(list)
+        for recipe_id, delta in clicks.items():
+            recipes_by_delta[delta].append(recipe_id)
+        for delta, ids in recipes_by_delta.items():
+            Recipe.objects.filter(pk__in=ids).update(
+                short_link_clicks=F('short_link_clicks') + delta
+            )
+
+
+click_buffer = ClickBuffer(SHORT_LINK_FLUSH_SIZE, SHORT_LINK_FLUSH_INTERVAL)
+atexit.register(click_buffer.flush)
+
+
+def short_link_redirect(request, code):
+    """Redirect /s/<code> to the recipe page of the frontend.
+
+    A plain Django view: no DRF request parsing, authentication or
+    content negotiation. The redirect is temporary so that browsers do
+    not cache it and every click is counted.
+    """
+    recipe_id = base62.decode(code)
+    if recipe_id is None or not recipe_exists(recipe_id):
+        raise Http404
+    click_buffer.add(recipe_id)
+    return HttpResponseRedirect(f'/recipes/{recipe_id}')
@@ -0,0 +1,73 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from api.cache import invalidate_cache
+from api.shortlinks import forget_recipe
+from api.storage import add_references, get_media_names, release_references
+from recipes.models import Ingredient, Recipe, Tag, User
+
+CACHE_NAMESPACES = {
+    Tag: 'tags',
+    Ingredient: 'ingredients',
+}
+
+MEDIA_FIELDS = {
+    Recipe: ('image', 'image_renditions'),
+    User: ('avatar', 'avatar_renditions'),
+}
+
+
+def invalidate_model_cache(sender, **kwargs):
+    namespace = CACHE_NAMESPACES.get(sender)
+    if namespace is not None:
+        invalidate_cache(namespace)
+
+
+for model in CACHE_NAMESPACES:
+    post_save.connect(invalidate_model_cache, sender=model)
+    post_delete.connect(invalidate_model_cache, sender=model)
+
+
+def forget_short_link(sender, instance, **kwargs):
+    forget_recipe(instance.id)
+
+
+post_delete.connect(forget_short_link, sender=Recipe)
+
+
+def get_instance_media(sender, instance):
+    return get_media_names({
+        field: getattr(instance, field) for field in MEDIA_FIELDS[sender]
+    })
+
+
+def remember_media(sender, instance, update_fields=None, **kwargs):
+    fields = MEDIA_FIELDS[sender]
+    if update_fields is not None and not set(fields) & set(update_fields):
+        instance._stored_media = None
+    elif instance._state.adding:
+        instance._stored_media = set()
+    else:
+        instance._stored_media = get_media_names(
+            sender.objects.filter(pk=instance.pk).values(*fields).first()
+            or {}
+        )
+
+
+def count_media_references(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_media', None)
+    if stored is None:
+        return
+    current = get_instance_media(sender, instance)
+    add_references(current - stored)
+    release_references(stored - current)
+    instance._stored_media = None
+
+
+def release_media(sender, instance, **kwargs):
+    release_references(get_instance_media(sender, instance))
+
+
+for model in MEDIA_FIELDS:
+    pre_save.connect(remember_media, sender=model)
+    post_save.connect(count_media_references, sender=model)
+    post_delete.connect(release_media, sender=model)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import posixpath
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from api.constants import CONTENT_DIR
+from recipes.models import MediaFile
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage naming files by the SHA-256 of their content.
+
+    Uploading a file that is already stored returns the existing name,
+    so identical avatars, recipe images and renditions share one file
+    and a name never changes meaning, which lets clients cache media
+    forever. Files are never overwritten or deleted here: references
+    are counted in MediaFile and collect_media removes orphans.
+    """
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        extension = posixpath.splitext(name)[1].lower()
+        name = f'{CONTENT_DIR}/{digest[:2]}/{digest}{extension}'
+        if not self.exists(name):
+            # Written under a temporary name and linked into place: of
+            # two identical uploads racing here one link wins and the
+            # other finds the file, instead of FileSystemStorage saving
+            # it again under a suffixed name.
+            temporary = super()._save(f'{name}.{uuid.uuid4().hex}', content)
+            try:
+                os.link(self.path(temporary), self.path(name))
+                return name
+            except FileExistsError:
+                pass
+            finally:
+                self.delete(temporary)
+        # A fresh mtime keeps collect_media from removing the file
+        # before the new reference to it is saved.
+        os.utime(self.path(name))
+        return name
+
+
+def get_media_names(values):
+    """Stored file names referenced by field values.
+
+    values maps field names to file names or to rendition dicts.
+    """
+    names = set()
+    for value in values.values():
+        if isinstance(value, dict):
+            names.update(value.values())
+        elif value:
+            names.add(str(value))
+    return names
+
+
+def add_references(names):
+    if not names:
+        return
+    MediaFile.objects.bulk_create(
+        (MediaFile(name=name) for name in names), ignore_conflicts=True
+    )
+    MediaFile.objects.filter(name__in=names).update(
+        references=F('references') + 1
+    )
+
+
+def release_references(names):
+    if names:
+        MediaFile.objects.filter(name__in=names).update(
+            references=Greatest(F('references') - 1, 0)
+        )
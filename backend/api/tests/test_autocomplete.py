@@ -0,0 +1,66 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.autocomplete import IngredientIndex
+from api.cache import invalidate_cache
+from recipes.models import Ingredient
+
+
+class IngredientIndexTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in (
+            'фасоль', 'Соль морская', 'соль', 'морская соль', 'Ёжевика',
+        ):
+            Ingredient.objects.create(name=name, measurement_unit='г')
+
+    def setUp(self):
+        self.index = IngredientIndex()
+
+    def search(self, query):
+        return [item['name'] for item in self.index.search(query)]
+
+    def test_prefix_matches_first(self):
+        self.assertEqual(
+            self.search('соль'),
+            ['соль', 'Соль морская', 'морская соль', 'фасоль']
+        )
+
+    def test_case_and_yo_are_folded(self):
+        for query in ('ежев', 'ЁЖЕВ', 'Ежевика '):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query), ['Ёжевика'])
+
+    def test_queries_shorter_than_a_trigram(self):
+        self.assertEqual(
+            self.search('со'),
+            ['соль', 'Соль морская', 'морская соль', 'фасоль']
+        )
+        self.assertEqual(self.search('ж'), ['Ёжевика'])
+        self.assertEqual(self.search('сь'), [])
+
+    def test_rebuilt_when_the_version_changes(self):
+        self.assertEqual(self.search('перец'), [])
+        Ingredient.objects.create(name='перец черный', measurement_unit='г')
+        self.assertEqual(self.search('перец'), ['перец черный'])
+        # update() sends no signals: the index stays stale until the
+        # version is bumped.
+        Ingredient.objects.filter(name='перец черный').update(
+            name='перец белый'
+        )
+        self.assertEqual(self.search('перец'), ['перец черный'])
+        invalidate_cache('ingredients')
+        self.assertEqual(self.search('перец'), ['перец белый'])
+
+    def test_api(self):
+        response = APIClient().get('/api/ingredients/?name=соль')
+        self.assertEqual(response.status_code, 200)
+        salt = Ingredient.objects.get(name='соль')
+        self.assertEqual(response.json()[0], {
+            'id': salt.pk, 'name': 'соль', 'measurement_unit': 'г'
+        })
+        self.assertEqual(
+            [item['name'] for item in response.json()],
+            ['соль', 'Соль морская', 'морская соль', 'фасоль']
+        )
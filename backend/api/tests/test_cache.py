@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.cache import get_cache_version
+from recipes.models import Ingredient, Tag
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'foodgram-test-cache',
+    }
+})
+class ReferenceCacheTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = Tag.objects.create(name='breakfast', slug='breakfast')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, url='/api/tags/', **headers):
+        return self.client.get(url, **headers)
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            second = self.get()
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.get(f'/api/tags/{self.tag.pk}/')
+        with self.assertNumQueries(0):
+            detail = self.get(f'/api/tags/{self.tag.pk}/')
+        self.assertEqual(detail.json()['slug'], 'breakfast')
+
+    def test_if_none_match(self):
+        etag = self.get()['ETag']
+        for header in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+            with self.subTest(header=header), self.assertNumQueries(0):
+                response = self.get(HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+        response = self.get(HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_save_and_delete_bump_the_version(self):
+        etag = self.get()['ETag']
+        version = get_cache_version('tags')
+        ingredients_version = get_cache_version('ingredients')
+        self.tag.name = 'lunch'
+        self.tag.save()
+        self.assertNotEqual(get_cache_version('tags'), version)
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['name'], 'lunch')
+        self.tag.delete()
+        self.assertEqual(self.get().json(), [])
+        self.assertEqual(
+            get_cache_version('ingredients'), ingredients_version
+        )
+        Ingredient.objects.create(name='salt', measurement_unit='г')
+        self.assertNotEqual(
+            get_cache_version('ingredients'), ingredients_version
+        )
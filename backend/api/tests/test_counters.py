@@ -0,0 +1,106 @@
+import io
+from types import SimpleNamespace
+
+from django.core.files.base import ContentFile
+from django.db.models import F
+from django.test import TestCase
+from PIL import Image
+
+from api.images import process_renditions
+from api.serializers import RecipeWriteSerializer
+from recipes.counters import recount_media_references
+from recipes.models import (
+    Ingredient,
+    IngredientAmount,
+    MediaFile,
+    Recipe,
+    Tag,
+    User,
+)
+
+
+class CounterLostUpdateTestCase(TestCase):
+    """Saving an instance loaded earlier keeps concurrent counter updates."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            username='author', email='author@example.com'
+        )
+        cls.tag = Tag.objects.create(name='tag', slug='tag')
+        cls.ingredient = Ingredient.objects.create(
+            name='ingredient', measurement_unit='г'
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author, name='recipe', text='text',
+            cooking_time=10, image='recipes/test.png',
+        )
+        IngredientAmount.objects.create(
+            recipe=cls.recipe, ingredient=cls.ingredient, amount=10
+        )
+
+    def test_recipe_update_keeps_counters(self):
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        Recipe.objects.filter(pk=recipe.pk).update(
+            favorites_count=F('favorites_count') + 1,
+            in_carts_count=F('in_carts_count') + 2,
+            image_renditions={'card': 'content/ab/rendition.webp'},
+        )
+        data = {
+            'name': 'renamed',
+            'tags': [self.tag.pk],
+            'ingredients': [{'id': self.ingredient.pk, 'amount': 20}],
+        }
+        serializer = RecipeWriteSerializer(
+            recipe, data=data, partial=True,
+            context={'request': SimpleNamespace(data=data, user=self.author)}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.name, 'renamed')
+        self.assertEqual(recipe.favorites_count, 1)
+        self.assertEqual(recipe.in_carts_count, 2)
+        self.assertEqual(
+            recipe.image_renditions, {'card': 'content/ab/rendition.webp'}
+        )
+
+    def test_user_full_save_keeps_counters(self):
+        user = User.objects.get(pk=self.author.pk)
+        User.objects.filter(pk=user.pk).update(
+            subscribers_count=F('subscribers_count') + 3
+        )
+        user.first_name = 'Renamed'
+        user.save()
+        user.refresh_from_db()
+        self.assertEqual(user.first_name, 'Renamed')
+        self.assertEqual(user.subscribers_count, 3)
+
+
+class MediaReferenceTestCase(TestCase):
+    """The recount and the signals agree on media references."""
+
+    def test_recount_small_image_then_delete(self):
+        author = User.objects.create(
+            username='author', email='author@example.com'
+        )
+        buffer = io.BytesIO()
+        Image.new('RGB', (2, 2), 'red').save(buffer, 'PNG')
+        recipe = Recipe(
+            author=author, name='recipe', text='text', cooking_time=10
+        )
+        recipe.image.save('recipe.png', ContentFile(buffer.getvalue()))
+        process_renditions(Recipe, recipe.pk, 'image', 'image_renditions')
+        recipe.refresh_from_db()
+        # Every rendition of a 2x2 image is the same file.
+        self.assertEqual(len(set(recipe.image_renditions.values())), 1)
+        recount_media_references(MediaFile, Recipe, User)
+        self.assertEqual(
+            dict(MediaFile.objects.values_list('name', 'references')),
+            {
+                recipe.image.name: 1,
+                recipe.image_renditions['thumbnail']: 1,
+            }
+        )
+        recipe.delete()
+        self.assertFalse(MediaFile.objects.filter(references__gt=0).exists())
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from psycopg2 import pool
+
+from foodgram.db.base import DatabaseWrapper
+
+
+class FakePool:
+
+    def __init__(self, connections):
+        self.idle = list(connections)
+        self.closed = []
+
+    def getconn(self):
+        if not self.idle:
+            raise pool.PoolError('connection pool exhausted')
+        return self.idle.pop(0)
+
+    def putconn(self, connection, close=False):
+        if close:
+            self.closed.append(connection)
+        else:
+            self.idle.append(connection)
+
+
+class PooledConnectionTestCase(SimpleTestCase):
+
+    def get_connection(self, connections, health_checks=True):
+        wrapper = DatabaseWrapper({
+            'NAME': 'foodgram', 'POOL_SIZE': 3,
+            'CONN_HEALTH_CHECKS': health_checks,
+        }, alias='pool-test')
+        with mock.patch.object(
+            DatabaseWrapper, 'connection_is_usable',
+            side_effect=lambda connection: connection != 'dead'
+        ):
+            return wrapper.get_pooled_connection(connections)
+
+    def test_dead_connections_are_closed(self):
+        connections = FakePool(['dead', 'dead', 'live'])
+        self.assertEqual(self.get_connection(connections), 'live')
+        self.assertEqual(connections.closed, ['dead', 'dead'])
+
+    def test_gives_up_after_pool_size_dead_connections(self):
+        connections = FakePool(['dead'] * 4 + ['live'])
+        self.assertIsNone(self.get_connection(connections))
+        self.assertEqual(connections.closed, ['dead'] * 3)
+
+    def test_exhausted_pool(self):
+        self.assertIsNone(self.get_connection(FakePool([])))
+        connections = FakePool(['dead'])
+        self.assertIsNone(self.get_connection(connections))
+        self.assertEqual(connections.closed, ['dead'])
+
+    def test_without_health_checks(self):
+        connections = FakePool(['dead', 'live'])
+        self.assertEqual(
+            self.get_connection(connections, health_checks=False), 'dead'
+        )
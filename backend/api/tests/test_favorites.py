@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from api.serializers import FavoriteSerializer, ShoppingListSerializer
+from api.utils import lock_recipes
+from recipes.models import Favorite, Recipe, ShoppingList, User
+
+
+class AddRecipeTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='user', email='user@example.com'
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name='recipe', text='text',
+            cooking_time=10, image='recipes/test.png',
+        )
+
+    def test_second_add_is_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        for action in ('favorite', 'shopping_cart'):
+            with self.subTest(action=action):
+                url = f'/api/recipes/{self.recipe.pk}/{action}/'
+                self.assertEqual(client.post(url).status_code, 201)
+                self.assertEqual(client.post(url).status_code, 400)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 1)
+        self.assertEqual(self.recipe.in_carts_count, 1)
+
+    def test_concurrent_add_after_validation(self):
+        context = {
+            'request': SimpleNamespace(method='POST', user=self.user),
+            'view': SimpleNamespace(kwargs={'pk': self.recipe.pk}),
+        }
+        for serializer_class, model in (
+            (FavoriteSerializer, Favorite),
+            (ShoppingListSerializer, ShoppingList),
+        ):
+            with self.subTest(model=model.__name__):
+                serializer = serializer_class(data={}, context=context)
+                serializer.is_valid(raise_exception=True)
+                # Another request wins the race between validate and save.
+                model.objects.create(user=self.user, recipes=self.recipe)
+                with self.assertRaises(ValidationError):
+                    serializer.save(user=self.user, recipes=self.recipe)
+                self.assertEqual(model.objects.count(), 1)
+
+
+class AddRecipesBulkTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='user', email='user@example.com'
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.user, name=f'recipe {index}', text='text',
+                cooking_time=10, image='recipes/test.png',
+            ) for index in range(3)
+        ]
+
+    def test_identical_request_wins_the_lock(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        recipe_ids = [recipe.pk for recipe in self.recipes]
+        for action, model, counter in (
+            ('favorite', Favorite, 'favorites_count'),
+            ('shopping_cart', ShoppingList, 'in_carts_count'),
+        ):
+
+            def add_while_waiting(ids):
+                # An identical request commits while this one waits.
+                lock.side_effect = lock_recipes
+                self.assertEqual(client.post(
+                    f'/api/recipes/{action}/bulk/', {'recipes': ids},
+                    format='json'
+                ).status_code, 201)
+                return lock_recipes(ids)
+
+            with self.subTest(action=action), mock.patch(
+                'api.views.lock_recipes', side_effect=add_while_waiting
+            ) as lock:
+                response = client.post(
+                    f'/api/recipes/{action}/bulk/', {'recipes': recipe_ids},
+                    format='json'
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), {
+                    'added': [], 'already_present': recipe_ids
+                })
+                self.assertEqual(model.objects.count(), len(recipe_ids))
+                self.assertEqual(set(Recipe.objects.values_list(
+                    counter, flat=True
+                )), {1})
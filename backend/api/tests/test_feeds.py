@@ -0,0 +1,156 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.feeds import fan_out_recipe
+from recipes.models import FeedEntry, Recipe, User
+
+
+@mock.patch('api.feeds.FEED_MAX_ENTRIES', 2)
+@mock.patch('api.feeds.FEED_FANOUT_MAX_FOLLOWERS', 2)
+class FeedFanOutTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            username='author', email='author@example.com'
+        )
+        cls.followers = [
+            User.objects.create(
+                username=f'follower{index}', email=f'follower{index}@ex.com'
+            ) for index in range(3)
+        ]
+
+    def subscribe(self, user, method='post'):
+        client = APIClient()
+        client.force_authenticate(user)
+        return getattr(client, method)(
+            f'/api/users/{self.author.pk}/subscribe/'
+        )
+
+    def publish(self, count):
+        recipes = []
+        for _ in range(count):
+            recipe = Recipe.objects.create(
+                author=self.author, name=f'recipe {Recipe.objects.count()}',
+                text='text', cooking_time=10, image='recipes/test.png',
+            )
+            recipe.author.refresh_from_db()
+            fan_out_recipe(recipe)
+            recipes.append(recipe)
+        return recipes
+
+    def get_timeline(self, user):
+        return list(FeedEntry.objects.filter(user=user).order_by(
+            '-pub_date', '-recipe_id'
+        ).values_list('recipe', flat=True))
+
+    def test_fan_out_trims_timelines(self):
+        for follower in self.followers[:2]:
+            self.assertEqual(self.subscribe(follower).status_code, 201)
+        recipes = self.publish(3)
+        for follower in self.followers[:2]:
+            self.assertEqual(
+                self.get_timeline(follower), [recipes[2].pk, recipes[1].pk]
+            )
+
+    def test_subscribe_that_crosses_the_threshold_is_not_fanned_out(self):
+        for follower in self.followers[:2]:
+            self.assertEqual(self.subscribe(follower).status_code, 201)
+        recipes = self.publish(2)
+        self.assertEqual(self.subscribe(self.followers[2]).status_code, 201)
+        self.assertEqual(self.get_timeline(self.followers[2]), [])
+        self.publish(1)
+        self.assertEqual(
+            self.get_timeline(self.followers[0]),
+            [recipes[1].pk, recipes[0].pk]
+        )
+
+    def test_backfill_when_author_is_fanned_out_again(self):
+        for follower in self.followers:
+            self.assertEqual(self.subscribe(follower).status_code, 201)
+        recipes = self.publish(3)
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertEqual(
+            self.subscribe(self.followers[0], 'delete').status_code, 204
+        )
+        for follower in self.followers[1:]:
+            self.assertEqual(
+                self.get_timeline(follower), [recipes[2].pk, recipes[1].pk]
+            )
+        self.assertEqual(self.get_timeline(self.followers[0]), [])
+
+
+class FeedApiTestCase(TestCase):
+    """Timelines of pushed authors merge with pulled authors' recipes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='reader', email='reader@example.com'
+        )
+        cls.pushed = User.objects.create(
+            username='pushed', email='pushed@example.com'
+        )
+        cls.pulled = User.objects.create(
+            username='pulled', email='pulled@example.com'
+        )
+        cls.others = [
+            User.objects.create(
+                username=f'other{index}', email=f'other{index}@ex.com'
+            ) for index in range(2)
+        ]
+        now = timezone.now()
+        cls.recipes = []
+        for index in range(7):
+            recipe = Recipe.objects.create(
+                author=(cls.pushed, cls.pulled)[index % 2],
+                name=f'recipe {index}', text='text', cooking_time=10,
+                image='recipes/test.png',
+            )
+            # Two recipes share a pub_date to exercise the id tiebreak.
+            Recipe.objects.filter(pk=recipe.pk).update(
+                pub_date=now - timedelta(hours=min(index, 5))
+            )
+            cls.recipes.append(recipe)
+
+    def setUp(self):
+        patcher = mock.patch('api.feeds.FEED_FANOUT_MAX_FOLLOWERS', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        for user, author in (
+            (self.others[0], self.pulled),
+            (self.others[1], self.pulled),
+            (self.user, self.pulled),
+            (self.user, self.pushed),
+        ):
+            self.client.force_authenticate(user)
+            self.assertEqual(self.client.post(
+                f'/api/users/{author.pk}/subscribe/'
+            ).status_code, 201)
+        self.client.force_authenticate(self.user)
+
+    def test_pages_merge_pushed_and_pulled_authors(self):
+        self.assertEqual(
+            set(FeedEntry.objects.filter(user=self.user).values_list(
+                'recipe__author', flat=True
+            )),
+            {self.pushed.pk}
+        )
+        expected = [
+            recipe.pk for recipe in Recipe.objects.order_by('-pub_date', '-id')
+        ]
+        received = []
+        url = '/api/recipes/feed/?limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page['results']), 2)
+            received += [recipe['id'] for recipe in page['results']]
+            url = page['next']
+        self.assertEqual(received, expected)
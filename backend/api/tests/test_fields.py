@@ -0,0 +1,42 @@
+import base64
+import io
+import textwrap
+from unittest import mock
+
+from django.test import SimpleTestCase
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from api.fields import StreamingBase64ImageField
+
+
+class StreamingBase64ImageFieldTestCase(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        buffer = io.BytesIO()
+        Image.new('RGB', (40, 30), 'red').save(buffer, 'PNG')
+        cls.content = buffer.getvalue()
+        cls.encoded = base64.b64encode(cls.content).decode()
+
+    def decode(self, data):
+        file = StreamingBase64ImageField().to_internal_value(data)
+        self.addCleanup(file.close)
+        return file.read()
+
+    def test_line_wrapped(self):
+        wrapped = '\r\n'.join(textwrap.wrap(self.encoded, 76))
+        # Chunks that cut through lines and quanta alike.
+        for chunk_size in (7 * 4, 64 * 1024 * 4):
+            with self.subTest(chunk_size=chunk_size), mock.patch(
+                'api.fields.BASE64_CHUNK_SIZE', chunk_size
+            ):
+                self.assertEqual(
+                    self.decode(f'data:image/png;base64,{wrapped}\n'),
+                    self.content
+                )
+
+    def test_truncated(self):
+        with self.assertRaises(ValidationError):
+            self.decode(self.encoded[:-1])
@@ -0,0 +1,84 @@
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe, Tag, User
+
+
+class RecipeSearchTestCase(TestCase):
+    """Search runs on the test database's backend, PostgreSQL or not."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            User.objects.create(
+                username=f'author{index}', email=f'author{index}@ex.com'
+            ) for index in range(2)
+        ]
+        cls.soup, cls.salad = (
+            Tag.objects.create(name=name, slug=name)
+            for name in ('soup', 'salad')
+        )
+        cls.recipes = {}
+        for name, text, author, tag, favorites in (
+            ('Tomato soup', 'Simmer tomatoes', 0, cls.soup, 1),
+            ('Greek salad', 'Chop tomato and cucumber', 1, cls.salad, 3),
+            ('Onion soup', 'Fry the onions', 1, cls.soup, 2),
+            ('Tomato salad', 'Slice', 1, cls.salad, 0),
+        ):
+            recipe = Recipe.objects.create(
+                author=cls.authors[author], name=name, text=text,
+                cooking_time=10, image='recipes/test.png',
+                favorites_count=favorites,
+            )
+            recipe.tags.set([tag])
+            cls.recipes[name] = recipe.pk
+
+    def get_names(self, params):
+        response = APIClient().get(f'/api/recipes/?limit=10&{params}')
+        self.assertEqual(response.status_code, 200)
+        return [recipe['name'] for recipe in response.data['results']]
+
+    def test_name_or_text(self):
+        self.assertEqual(
+            set(self.get_names('search=tomato')),
+            {'Tomato soup', 'Greek salad', 'Tomato salad'}
+        )
+        self.assertEqual(self.get_names('search=onion'), ['Onion soup'])
+        self.assertEqual(self.get_names('search=pumpkin'), [])
+
+    def test_with_tags_and_author(self):
+        self.assertEqual(
+            set(self.get_names('search=tomato&tags=salad')),
+            {'Greek salad', 'Tomato salad'}
+        )
+        self.assertEqual(
+            set(self.get_names(
+                f'search=tomato&tags=salad&tags=soup'
+                f'&author={self.authors[1].pk}'
+            )),
+            {'Greek salad', 'Tomato salad'}
+        )
+        self.assertEqual(
+            self.get_names(f'search=tomato&author={self.authors[0].pk}'),
+            ['Tomato soup']
+        )
+
+    def test_with_ordering(self):
+        self.assertEqual(
+            self.get_names('search=tomato&ordering=-popularity'),
+            ['Greek salad', 'Tomato soup', 'Tomato salad']
+        )
+        self.assertEqual(
+            self.get_names('search=tomato&ordering=popularity&tags=salad'),
+            ['Tomato salad', 'Greek salad']
+        )
+
+    @unittest.skipUnless(
+        connection.vendor == 'postgresql', 'Full-text ranking needs PostgreSQL'
+    )
+    def test_name_matches_rank_first(self):
+        names = self.get_names('search=tomato')
+        self.assertEqual(names[-1], 'Greek salad')
@@ -0,0 +1,49 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from recipes.models import Tag
+
+
+class LoadDataTestCase(TestCase):
+
+    def load(self, content, *args):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'tags.csv'
+        path.write_text(content, encoding='utf-8')
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            'load_data', str(path), 'Tag', *args,
+            stdout=stdout, stderr=stderr
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_dry_run_counts_rows(self):
+        Tag.objects.create(name='soup', slug='soup')
+        stdout, _ = self.load(
+            'name,slug\nsoup,soup\nsalad,salad\ndessert,dessert\n',
+            '--dry-run'
+        )
+        self.assertIn('создано 2, обновлено 1', stdout)
+        self.assertEqual(Tag.objects.count(), 1)
+
+    def test_conflict_on_another_unique_field(self):
+        Tag.objects.create(name='soup', slug='soup')
+        # Keyed by name, the new row clashes on slug.
+        content = 'name,slug\nsalad,salad\nbroth,soup\n'
+        with self.assertRaises(CommandError):
+            self.load(content)
+        self.assertFalse(Tag.objects.filter(name='salad').exists())
+        stdout, stderr = self.load(content, '--skip-invalid')
+        self.assertIn('Строки 1-2: пакет не сохранен', stderr)
+        self.assertIn('создано 0', stdout)
+        stdout, stderr = self.load(
+            content, '--skip-invalid', '--batch-size', '1'
+        )
+        self.assertIn('Строки 2-2', stderr)
+        self.assertIn('создано 1', stdout)
+        self.assertTrue(Tag.objects.filter(name='salad').exists())
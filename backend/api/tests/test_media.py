@@ -0,0 +1,66 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from api.storage import ContentAddressedStorage
+from recipes.models import MediaFile, Recipe, User
+
+
+class MediaRootTestCase(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings = override_settings(MEDIA_ROOT=media_root.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class ContentAddressedStorageTestCase(MediaRootTestCase):
+
+    def test_identical_uploads_share_one_name(self):
+        first = default_storage.save('a.png', ContentFile(b'content'))
+        # A concurrent upload checked exists() before the first finished.
+        with mock.patch.object(
+            ContentAddressedStorage, 'exists', return_value=False
+        ):
+            second = default_storage.save('b.png', ContentFile(b'content'))
+        self.assertEqual(first, second)
+        self.assertEqual(
+            os.listdir(os.path.dirname(default_storage.path(first))),
+            [os.path.basename(first)]
+        )
+
+
+class CollectMediaTestCase(MediaRootTestCase):
+
+    def save_old(self, content):
+        name = default_storage.save('file.png', ContentFile(content))
+        os.utime(default_storage.path(name), (0, 0))
+        return name
+
+    def test_keeps_files_referenced_without_media_file_rows(self):
+        author = User.objects.create(
+            username='author', email='author@example.com'
+        )
+        image, rendition, orphan = (
+            self.save_old(content) for content in (b'image', b'card', b'old')
+        )
+        # As loaded by bulk_create or changed by update(): no signals ran.
+        Recipe.objects.bulk_create([Recipe(
+            author=author, name='recipe', text='text', cooking_time=10,
+            image=image, image_renditions={'card': rendition},
+        )])
+        MediaFile.objects.all().delete()
+        stdout = StringIO()
+        call_command('collect_media', grace_minutes=0, stdout=stdout)
+        self.assertTrue(default_storage.exists(image))
+        self.assertTrue(default_storage.exists(rendition))
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertIn('--recount', stdout.getvalue())
@@ -0,0 +1,48 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe, User
+
+
+class RecipeCursorPaginationTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(
+            username='author', email='author@example.com'
+        )
+        for index in range(5):
+            Recipe.objects.create(
+                author=author, name=f'recipe {index}', text='text',
+                cooking_time=10, image='recipes/test.png',
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_pages_follow_publication_order(self):
+        url = '/api/recipes/?limit=2&cursor='
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [recipe['id'] for recipe in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(ids, list(
+            Recipe.objects.order_by('pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        ))
+
+    def test_conflicting_order_is_rejected(self):
+        for params in ('ordering=-popularity', 'search=recipe'):
+            with self.subTest(params=params):
+                response = self.client.get(
+                    f'/api/recipes/?cursor=&{params}'
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('cursor', response.data)
+
+    def test_publication_order_is_allowed(self):
+        response = self.client.get('/api/recipes/?cursor=&ordering=pub_date')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,143 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    Subscription,
+    Tag,
+    User,
+)
+
+
+class QueryCountTestCase(TestCase):
+    """Read endpoints run a constant number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='reader', email='reader@example.com'
+        )
+        cls.tags = [
+            Tag.objects.create(name=f'tag {index}', slug=f'tag-{index}')
+            for index in range(3)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'ingredient {index}', measurement_unit='г'
+            ) for index in range(5)
+        ]
+        authors = [
+            User.objects.create(
+                username=f'author{index}', email=f'author{index}@ex.com'
+            ) for index in range(4)
+        ]
+        for index in range(12):
+            recipe = Recipe.objects.create(
+                author=authors[index % len(authors)],
+                name=f'recipe {index}',
+                text='text',
+                cooking_time=10,
+                image='recipes/test.png',
+            )
+            recipe.tags.set(cls.tags[:2])
+            IngredientAmount.objects.bulk_create(
+                IngredientAmount(
+                    recipe=recipe, ingredient=ingredient, amount=10
+                ) for ingredient in cls.ingredients[:3]
+            )
+        Subscription.objects.bulk_create(
+            Subscription(user=cls.user, subscriber=author)
+            for author in authors
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_constant_queries(self, url, count, limits):
+        for limit in limits:
+            with self.subTest(limit=limit), self.assertNumQueries(count):
+                response = self.client.get(f'{url}limit={limit}')
+                self.assertEqual(response.status_code, 200)
+
+    def test_recipe_list(self):
+        # COUNT, recipes with author and annotations, tags, ingredients.
+        self.assert_constant_queries('/api/recipes/?', 4, (1, 6, 12))
+
+    def test_recipe_list_anonymous(self):
+        self.client.force_authenticate(None)
+        self.assert_constant_queries('/api/recipes/?', 4, (1, 6, 12))
+
+    def test_subscriptions(self):
+        # COUNT, authors, one windowed query for the recipe previews.
+        self.assert_constant_queries(
+            '/api/users/subscriptions/?recipes_limit=2&', 3, (1, 4)
+        )
+
+
+class RecipeWriteQueryCountTestCase(TestCase):
+    """Recipe writes do not run a query per ingredient or tag."""
+
+    image = (
+        'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAIAAAACCAIAAAD91Jpz'
+        'AAAAFklEQVR4nGP8z8DAwMDAxMDAwMDAAAANHQEDasKb6QAAAABJRU5ErkJggg=='
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='author', email='author@example.com'
+        )
+        cls.tags = [
+            Tag.objects.create(name=f'tag {index}', slug=f'tag-{index}')
+            for index in range(6)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'ingredient {index}', measurement_unit='г'
+            ) for index in range(30)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_data(self, size):
+        return {
+            'name': f'recipe {size}',
+            'text': 'text',
+            'cooking_time': 10,
+            'image': self.image,
+            'tags': [tag.pk for tag in self.tags[:size // 5]],
+            'ingredients': [
+                {'id': ingredient.pk, 'amount': 10}
+                for ingredient in self.ingredients[:size]
+            ],
+        }
+
+    def test_recipe_create(self):
+        # Name check, ingredients and tags in bulk, savepoints, insert,
+        # media reference, amounts and tags in bulk, followers for the
+        # feed, recipes_count, then tags and amounts for the response.
+        for size in (5, 30):
+            with self.subTest(size=size), self.assertNumQueries(17):
+                response = self.client.post(
+                    '/api/recipes/', self.get_data(size), format='json'
+                )
+                self.assertEqual(response.status_code, 201)
+
+    def test_recipe_update(self):
+        recipe = self.client.post(
+            '/api/recipes/', self.get_data(5), format='json'
+        ).json()
+        # Same bulk writes as create plus the recipe lookup with its
+        # prefetches; only the added amounts and tags are inserted.
+        for size in (10, 30):
+            with self.subTest(size=size), self.assertNumQueries(15):
+                response = self.client.patch(
+                    f'/api/recipes/{recipe["id"]}/',
+                    self.get_data(size), format='json'
+                )
+                self.assertEqual(response.status_code, 200)
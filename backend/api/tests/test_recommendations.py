@@ -0,0 +1,101 @@
+import math
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from api.recommendations import (
+    iter_neighbors,
+    load_interactions,
+    rebuild_similarities,
+)
+from recipes.models import Favorite, Recipe, ShoppingList, User
+
+
+class NeighborsTestCase(SimpleTestCase):
+
+    def neighbors(self, recipes_by_user, **kwargs):
+        users_by_recipe = {}
+        for user_id, recipes in recipes_by_user.items():
+            for recipe_id, weight in recipes.items():
+                users_by_recipe.setdefault(recipe_id, {})[user_id] = weight
+        return dict(iter_neighbors(users_by_recipe, recipes_by_user, **kwargs))
+
+    def test_cosine_without_heavy_users(self):
+        neighbors = self.neighbors({
+            1: {10: 1.0, 20: 1.0},
+            2: {10: 1.0, 20: 0.5},
+            # Skipped as evidence and in the norms alike.
+            3: {10: 1.0, 20: 1.0, 30: 1.0},
+        }, max_user_items=2)
+        score = 1.5 / (math.sqrt(2) * math.sqrt(1.25))
+        self.assertEqual(neighbors.keys(), {10, 20})
+        self.assertAlmostEqual(neighbors[10][0][0], score)
+        self.assertEqual(neighbors[10][0][1], 20)
+        self.assertAlmostEqual(neighbors[20][0][0], score)
+
+    def test_identical_columns_score_one_and_top_k(self):
+        neighbors = self.neighbors({
+            1: {10: 1.0, 20: 1.0, 30: 1.0},
+            2: {10: 1.0, 20: 1.0},
+        }, top_k=1)
+        self.assertEqual(len(neighbors[10]), 1)
+        score, similar_id = neighbors[10][0]
+        self.assertAlmostEqual(score, 1.0)
+        self.assertEqual(similar_id, 20)
+
+
+class RecommendedTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='user', email='user@example.com'
+        )
+        cls.others = [
+            User.objects.create(
+                username=f'other{index}', email=f'other{index}@ex.com'
+            ) for index in range(3)
+        ]
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.others[0], name=f'recipe {index}', text='text',
+                cooking_time=10, image='recipes/test.png',
+                favorites_count=index,
+            ) for index in range(5)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_ids(self, url='/api/recipes/recommended/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.json()]
+
+    def test_favorite_outweighs_cart(self):
+        recipe = self.recipes[0]
+        ShoppingList.objects.create(user=self.user, recipes=recipe)
+        Favorite.objects.create(user=self.user, recipes=recipe)
+        _, recipes_by_user = load_interactions()
+        self.assertEqual(recipes_by_user[self.user.pk], {recipe.pk: 1.0})
+
+    def test_similar_recipes_first(self):
+        first, second, third, fourth, _ = self.recipes
+        Favorite.objects.create(user=self.user, recipes=first)
+        for recipe in (first, second, third):
+            Favorite.objects.create(user=self.others[0], recipes=recipe)
+        for recipe in (first, second):
+            Favorite.objects.create(user=self.others[1], recipes=recipe)
+        Favorite.objects.create(user=self.others[2], recipes=fourth)
+        rebuild_similarities()
+        self.assertEqual(self.get_ids(), [second.pk, third.pk])
+        self.assertEqual(
+            self.get_ids('/api/recipes/recommended/?limit=1'), [second.pk]
+        )
+
+    def test_fallback_without_interactions(self):
+        self.assertEqual(
+            self.get_ids('/api/recipes/recommended/?limit=3'),
+            [recipe.pk for recipe in self.recipes[:-4:-1]]
+        )
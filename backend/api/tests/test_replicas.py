@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe, User
+
+REPLICA = 'replica_0'
+
+
+def with_replica_middleware(middleware):
+    index = middleware.index('api.metrics.MetricsMiddleware') + 1
+    return [
+        *middleware[:index],
+        'api.replicas.ReplicaRoutingMiddleware',
+        *middleware[index:],
+    ]
+
+
+class ReplicaRoutingTestCase(TestCase):
+    """Safe requests read from the replica unless the client just wrote.
+
+    The replica is a separate SQLite database that receives no
+    replication, so where a read went is visible in the response.
+    """
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='reader', email='reader@example.com'
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        # Authentication reads the token from the replica as well.
+        User.objects.using(REPLICA).create(
+            pk=cls.user.pk, username='reader', email='reader@example.com'
+        )
+        Token.objects.using(REPLICA).create(key=cls.token.key, user=cls.user)
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name='recipe', text='text',
+            cooking_time=10, image='recipes/test.png',
+        )
+
+    def setUp(self):
+        cache.clear()
+        override = override_settings(
+            DATABASE_ROUTERS=['api.replicas.ReplicaRouter'],
+            DATABASE_REPLICAS=[REPLICA],
+            MIDDLEWARE=with_replica_middleware(settings.MIDDLEWARE),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def recipe_count(self, client=None):
+        response = (client or self.client).get('/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['count']
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.recipe_count(), 0)
+        self.assertEqual(self.recipe_count(APIClient()), 0)
+
+    def test_reads_stick_to_primary_after_write(self):
+        response = self.client.post(
+            f'/api/recipes/{self.recipe.pk}/favorite/'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.recipe_count(), 1)
+        # Other clients keep reading from the replica.
+        self.assertEqual(self.recipe_count(APIClient()), 0)
+        cache.clear()
+        self.assertEqual(self.recipe_count(), 0)
+
+    def test_failed_write_does_not_stick(self):
+        response = self.client.post('/api/recipes/0/favorite/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.recipe_count(), 0)
@@ -0,0 +1,86 @@
+import json
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingList,
+    User,
+)
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+class DownloadShoppingCartTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='user', email='user@example.com'
+        )
+        flour, milk = (
+            Ingredient.objects.create(name=name, measurement_unit=unit)
+            for name, unit in (('мука', 'г'), ('молоко', 'мл'))
+        )
+        for index, amounts in enumerate((
+            {flour: 100},
+            {flour: 300, milk: 300},
+        )):
+            recipe = Recipe.objects.create(
+                author=cls.user, name=f'recipe {index}', text='text',
+                cooking_time=10, image='recipes/test.png',
+            )
+            for ingredient, amount in amounts.items():
+                IngredientAmount.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=amount
+                )
+            ShoppingList.objects.create(user=cls.user, recipes=recipe)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def download(self, query=''):
+        response = self.client.get(f'{URL}{query}')
+        content = b''.join(response.streaming_content).decode()
+        return response, content
+
+    def test_csv_is_the_default(self):
+        for query in ('', '?format=', '?format=csv'):
+            with self.subTest(query=query):
+                response, content = self.download(query)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response['Content-Type'], 'text/csv; charset=utf-8'
+                )
+                self.assertIn('.csv"', response['Content-Disposition'])
+                self.assertEqual(content.splitlines(), [
+                    'Ингредиент,Единица измерения,Количество',
+                    'молоко,мл,300',
+                    'мука,г,400',
+                ])
+
+    def test_txt(self):
+        response, content = self.download('?format=txt')
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+        self.assertEqual(
+            content, 'Список покупок\n\nмолоко (мл) — 300\nмука (г) — 400\n'
+        )
+
+    def test_json(self):
+        response, content = self.download('?format=json')
+        self.assertEqual(
+            response['Content-Type'], 'application/json; charset=utf-8'
+        )
+        self.assertEqual(json.loads(content), [
+            {'name': 'молоко', 'measurement_unit': 'мл', 'amount': 300},
+            {'name': 'мука', 'measurement_unit': 'г', 'amount': 400},
+        ])
+
+    def test_unknown_format(self):
+        response = self.client.get(f'{URL}?format=xml')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('format', response.json())
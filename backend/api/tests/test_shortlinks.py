@@ -0,0 +1,75 @@
+import threading
+
+from django.test import SimpleTestCase, TestCase
+
+from api import base62
+from api.shortlinks import ClickBuffer, click_buffer
+from recipes.models import Recipe, User
+
+
+class Base62TestCase(SimpleTestCase):
+
+    def test_round_trip(self):
+        for number in (0, 1, 61, 62, 10 ** 9, base62.MAX_VALUE):
+            with self.subTest(number=number):
+                self.assertEqual(base62.decode(base62.encode(number)), number)
+
+    def test_rejects_non_canonical_and_out_of_range_codes(self):
+        for code in ('', '01', 'a-b', 'a' * 24,
+                     base62.encode(base62.MAX_VALUE + 1)):
+            with self.subTest(code=code):
+                self.assertIsNone(base62.decode(code))
+
+
+class ShortLinkRedirectTestCase(TestCase):
+
+    def test_redirects_to_recipe(self):
+        author = User.objects.create(
+            username='author', email='author@example.com'
+        )
+        recipe = Recipe.objects.create(
+            author=author, name='recipe', text='text',
+            cooking_time=10, image='recipes/test.png',
+        )
+        response = self.client.get(f'/s/{recipe.short_link}')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], f'/recipes/{recipe.pk}')
+        click_buffer.flush()
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.short_link_clicks, 1)
+
+    def test_oversized_code_is_not_found(self):
+        self.assertEqual(self.client.get(f'/s/{"z" * 24}').status_code, 404)
+
+
+class RecordingClickBuffer(ClickBuffer):
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.written = []
+        self.flushed = threading.Event()
+
+    def write(self, clicks):
+        self.written.append(dict(clicks))
+        self.flushed.set()
+
+    def flush_in_thread(self):
+        self.flush()
+
+
+class ClickBufferTestCase(SimpleTestCase):
+
+    def test_flushes_after_interval_without_further_clicks(self):
+        buffer = RecordingClickBuffer(100, 0.05)
+        buffer.add(1)
+        buffer.add(1)
+        self.assertEqual(buffer.written, [])
+        self.assertTrue(buffer.flushed.wait(2))
+        self.assertEqual(buffer.written, [{1: 2}])
+
+    def test_flushes_when_full(self):
+        buffer = RecordingClickBuffer(2, 60)
+        buffer.add(1)
+        buffer.add(2)
+        self.assertEqual(buffer.written, [{1: 1, 2: 1}])
+        self.assertIsNone(buffer.timer)
@@ -1,23 +1,133 @@
-import io
 import csv
-from django.db.models import Sum
+import json
 
-from recipes.models import ShoppingList, IngredientAmount
+from django.db.models import F, Sum, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, RowNumber
 
+from api.constants import SHOPPING_LIST_CHUNK_SIZE
+from recipes.models import Recipe, IngredientAmount
 
-def get_shopping_list(user):
-    ingredient_counts = {}
-    shopping_card = io.StringIO()
-    writer = csv.writer(shopping_card)
-    writer.writerow(['Ингредиент', 'Количество'])
-    ingredients_and_totals = IngredientAmount.objects.filter(
-        ingredient__in=ShoppingList.objects.filter(user=user).values_list(
-            'recipes__ingredients__id', flat=True
+
+def get_shopping_list_ingredients(user):
+    """Sum ingredient amounts over the recipes in the user's cart."""
+    return IngredientAmount.objects.filter(
+        recipe__shoppinglist_recipes__user=user
+    ).values(
+        'ingredient__name', 'ingredient__measurement_unit'
+    ).annotate(
+        total_amount=Sum('amount')
+    ).order_by('ingredient__name', 'ingredient__measurement_unit')
+
+
+class Echo:
+    """File-like object which returns the written value for streaming."""
+
+    def write(self, value):
+        return value
+
+
+def iter_shopping_list_csv(items):
+    writer = csv.writer(Echo())
+    yield writer.writerow(['Ингредиент', 'Единица измерения', 'Количество'])
+    for item in items:
+        yield writer.writerow([
+            item['ingredient__name'],
+            item['ingredient__measurement_unit'],
+            item['total_amount'],
+        ])
+
+
+def iter_shopping_list_txt(items):
+    yield 'Список покупок\n\n'
+    for item in items:
+        yield (
+            f'{item["ingredient__name"]} '
+            f'({item["ingredient__measurement_unit"]}) '
+            f'— {item["total_amount"]}\n'
+        )
+
+
+def iter_shopping_list_json(items):
+    yield '['
+    for index, item in enumerate(items):
+        yield ('' if index == 0 else ',') + json.dumps(
+            {
+                'name': item['ingredient__name'],
+                'measurement_unit': item['ingredient__measurement_unit'],
+                'amount': item['total_amount'],
+            },
+            ensure_ascii=False
         )
-    ).values('ingredient__name').annotate(total_amount=Sum('amount'))
-    for item in ingredients_and_totals:
-        ingredient_counts[item['ingredient__name']] = item['total_amount']
-    for key, value in ingredient_counts.items():
-        writer.writerow([key, value])
-    shopping_card.seek(0)
-    return shopping_card
+    yield ']'
+
+
+SHOPPING_LIST_FORMATS = {
+    'csv': ('text/csv', iter_shopping_list_csv),
+    'txt': ('text/plain', iter_shopping_list_txt),
+    'json': ('application/json', iter_shopping_list_json),
+}
+
+
+def stream_shopping_list(user, export_format):
+    """Return content type and a generator of the rendered shopping list.
+
+    Rows are read through a server-side cursor, so the document is never
+    held in memory as a whole.
+    """
+    content_type, iter_rows = SHOPPING_LIST_FORMATS[export_format]
+    items = get_shopping_list_ingredients(user).iterator(
+        chunk_size=SHOPPING_LIST_CHUNK_SIZE
+    )
+    return f'{content_type}; charset=utf-8', iter_rows(items)
+
+
+def lock_recipes(recipe_ids):
+    """Lock recipe rows in pk order for the rest of the transaction.
+
+    Writers of favorites and carts take the lock before they read what
+    the user already has, so concurrent requests for the same recipes
+    run one after another and shift the counters once per added row.
+    """
+    return list(Recipe.objects.select_for_update().filter(
+        pk__in=recipe_ids
+    ).order_by('pk').values_list('pk', flat=True))
+
+
+def update_counter(queryset, counter, delta):
+    """Atomically shift a denormalized counter, never below zero."""
+    if delta:
+        queryset.update(**{counter: Greatest(F(counter) + delta, 0)})
+
+
+def get_recipes_limit(request):
+    recipes_limit = request.query_params.get('recipes_limit')
+    if recipes_limit is None or not recipes_limit.isdigit():
+        return None
+    return int(recipes_limit)
+
+
+def prefetch_recipes_preview(authors, recipes_limit=None):
+    """Attach recipes_preview to every author using a single query."""
+    authors = list(authors)
+    author_ids = [author.pk for author in authors]
+    recipes = Recipe.objects.filter(author_id__in=author_ids)
+    if recipes_limit is not None:
+        ranked_sql, params = recipes.annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=F('author_id'),
+                order_by=[F('pub_date').asc(), F('id').asc()],
+            )
+        ).values('id', 'row_number').query.sql_with_params()
+        recipes = recipes.filter(id__in=RawSQL(
+            f'SELECT ranked.id FROM ({ranked_sql}) ranked '
+            f'WHERE ranked.row_number <= %s',
+            (*params, recipes_limit)
+        ))
+    recipes_by_author = {author_id: [] for author_id in author_ids}
+    for recipe in recipes.order_by('pub_date', 'id'):
+        recipes_by_author[recipe.author_id].append(recipe)
+    for author in authors:
+        author.recipes_preview = recipes_by_author[author.pk]
+    return authors
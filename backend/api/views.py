@@ -1,5 +1,12 @@
-from django.db.models import Exists, OuterRef
-from django.http import FileResponse
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    Exists,
+    OuterRef,
+    Prefetch,
+    Value,
+)
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.serializers import SetPasswordSerializer
@@ -13,10 +20,26 @@ from rest_framework.permissions import (
     IsAuthenticatedOrReadOnly,
 )
 
-from api.utils import get_shopping_list
+from api.autocomplete import ingredient_index
+from api.cache import CachedReadOnlyMixin
+from api.constants import (
+    RECOMMENDATIONS_LIMIT,
+    RECOMMENDATIONS_MAX_LIMIT,
+    SHOPPING_LIST_FILENAME,
+)
+from api.utils import (
+    SHOPPING_LIST_FORMATS,
+    get_recipes_limit,
+    lock_recipes,
+    prefetch_recipes_preview,
+    stream_shopping_list,
+    update_counter,
+)
 from api.filters import IngredientFilter, RecipetFilter
-from api.paginations import NoPagination
+from api.feeds import add_author_to_feed, remove_author_from_feed
+from api.paginations import FeedPagination, NoPagination, RecipePagination
 from api.permissions import RecipePermission
+from api.recommendations import get_recommendations
 from api.serializers import (
     UserSerializer,
     TagSerializer,
@@ -26,14 +49,17 @@ from api.serializers import (
     ShoppingListSerializer,
     RecipeGetSerializer,
     RecipeWriteSerializer,
+    RecipeBulkSerializer,
     AvatarSerializer,
     CreatetUserSerializer,
+    UserWithRecipeSerializer,
 )
 from recipes.models import (
     Recipe,
     User,
     Tag,
     Ingredient,
+    IngredientAmount,
     Favorite,
     ShoppingList,
     Subscription,
@@ -81,7 +107,11 @@ class UserViewSet(DjoserUserViewSet):
     @avatar.mapping.delete
     def delete_avater(self, request, *args, **kwargs):
         user = self.request.user
-        user.avatar.delete()
+        # The file may be shared with other uploads; collect_media
+        # removes it once nothing references it.
+        user.avatar = None
+        user.avatar_renditions = {}
+        user.save(update_fields=['avatar', 'avatar_renditions'])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -90,8 +120,14 @@ class UserViewSet(DjoserUserViewSet):
         permission_classes=[IsAuthenticated],
     )
     def subscriptions(self, request, *args, **kwargs):
-        users = self.request.user.respondent.all()
-        page = self.paginate_queryset(users)
+        authors = User.objects.filter(
+            subscribers__user=self.request.user
+        ).annotate(
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).order_by('subscribers__id')
+        page = prefetch_recipes_preview(
+            self.paginate_queryset(authors), get_recipes_limit(request)
+        )
         serializer = self.get_serializer(page, many=True)
         serializer = self.get_paginated_response(serializer.data)
         return Response(serializer.data)
@@ -106,10 +142,17 @@ class UserViewSet(DjoserUserViewSet):
         subscriber = get_object_or_404(User, pk=kwargs[self.pk_url_kwarg])
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(
-            user=user,
-            subscriber=subscriber
-        )
+        subscriber.is_subscribed = True
+        prefetch_recipes_preview([subscriber], get_recipes_limit(request))
+        with transaction.atomic():
+            serializer.save(
+                user=user,
+                subscriber=subscriber
+            )
+            update_counter(
+                User.objects.filter(pk=subscriber.pk), 'subscribers_count', 1
+            )
+            add_author_to_feed(user, subscriber)
         headers = self.get_success_headers(serializer.data)
         return Response(
             serializer.data,
@@ -121,15 +164,24 @@ class UserViewSet(DjoserUserViewSet):
     def unsubscride(self, request, *args, **kwargs):
         user = self.request.user
         subscriber = get_object_or_404(User, pk=kwargs[self.pk_url_kwarg])
-        del_count, _ = Subscription.objects.filter(
-            user=user, subscriber=subscriber
-        ).delete()
+        with transaction.atomic():
+            del_count, _ = Subscription.objects.filter(
+                user=user, subscriber=subscriber
+            ).delete()
+            update_counter(
+                User.objects.filter(pk=subscriber.pk),
+                'subscribers_count', -del_count
+            )
+            if del_count:
+                remove_author_from_feed(user, subscriber)
         if del_count:
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
     def get_serializer_class(self):
-        if self.action in ['subscriptions', 'subscribe']:
+        if self.action == 'subscriptions':
+            return UserWithRecipeSerializer
+        if self.action == 'subscribe':
             return SubscriptionSerializer
         if self.action == 'set_password':
             return SetPasswordSerializer
@@ -138,25 +190,44 @@ class UserViewSet(DjoserUserViewSet):
         return UserSerializer
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedReadOnlyMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespace = 'tags'
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = NoPagination
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CachedReadOnlyMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespace = 'ingredients'
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     pagination_class = NoPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = IngredientFilter
 
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('name'):
+            return super().list(request, *args, **kwargs)
+        return self.get_cached_response(self.autocomplete, request)
+
+    def autocomplete(self, request):
+        return Response(
+            ingredient_index.search(request.query_params['name'])
+        )
+
 
 class RecipeViewSet(viewsets.ModelViewSet):
-    queryset = Recipe.objects.prefetch_related('author', 'ingredients', 'tags')
+    queryset = Recipe.objects.select_related('author').prefetch_related(
+        'tags',
+        Prefetch(
+            'ingredientamount_set',
+            queryset=IngredientAmount.objects.select_related('ingredient'),
+            to_attr='ingredient_amounts'
+        ),
+    ).defer('search_vector')
     pk_url_kwarg = 'pk'
     serializer_class = RecipeWriteSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = RecipePagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipetFilter
     permission_classes = [IsAuthenticatedOrReadOnly, RecipePermission]
@@ -175,24 +246,38 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 subscriber=OuterRef('author'), user=user
             )
             return super().get_queryset().annotate(
-                is_favorite=Exists(favorites),
+                is_favorited=Exists(favorites),
                 is_in_shopping_cart=Exists(shopping_cart),
                 is_subscribed=Exists(subscribers)
             )
         return super().get_queryset()
 
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
+        update_counter(
+            User.objects.filter(pk=self.request.user.pk), 'recipes_count', 1
+        )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        update_counter(
+            User.objects.filter(pk=instance.author_id), 'recipes_count', -1
+        )
 
-    def action_base_post(self):
+    def action_base_post(self, counter):
         user = self.request.user
         recipe = get_object_or_404(Recipe, pk=self.kwargs[self.pk_url_kwarg])
         serializer = self.get_serializer(data=self.request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(
-            user=user,
-            recipes=recipe
-        )
+        with transaction.atomic():
+            lock_recipes([recipe.pk])
+            serializer.save(
+                user=user,
+                recipes=recipe
+            )
+            update_counter(Recipe.objects.filter(pk=recipe.pk), counter, 1)
         headers = self.get_success_headers(serializer.data)
         return Response(
             serializer.data,
@@ -200,18 +285,64 @@ class RecipeViewSet(viewsets.ModelViewSet):
             headers=headers
         )
 
-    def action_base_delete(self, manager):
+    def action_base_delete(self, manager, counter):
         user = self.request.user
         recipe = get_object_or_404(Recipe, pk=self.kwargs[self.pk_url_kwarg])
-        if manager.filter(
-            user=user, recipes=recipe
-        ).exists():
-            manager.filter(
-                user=user, recipes=recipe
-            ).delete()
+        with transaction.atomic():
+            del_count, _ = manager.filter(user=user, recipes=recipe).delete()
+            update_counter(
+                Recipe.objects.filter(pk=recipe.pk), counter, -del_count
+            )
+        if del_count:
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
+    def action_bulk_post(self, model, counter):
+        """Add several recipes at once and report which were added.
+
+        Validation is one id__in query and the insert is one
+        bulk_create relying on the (user, recipes) unique constraint.
+        The recipes are locked first, so an identical request running
+        at the same time sees these rows as present.
+        """
+        serializer = self.get_serializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+        user = self.request.user
+        with transaction.atomic():
+            lock_recipes(recipe_ids)
+            present = set(model.objects.filter(
+                user=user, recipes__in=recipe_ids
+            ).values_list('recipes', flat=True))
+            added = [pk for pk in recipe_ids if pk not in present]
+            model.objects.bulk_create(
+                (model(user=user, recipes_id=pk) for pk in added),
+                ignore_conflicts=True
+            )
+            update_counter(Recipe.objects.filter(pk__in=added), counter, 1)
+        return Response(
+            {'added': added, 'already_present': sorted(present)},
+            status=status.HTTP_201_CREATED if added else status.HTTP_200_OK
+        )
+
+    def action_bulk_delete(self, model, counter):
+        serializer = self.get_serializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+        user = self.request.user
+        with transaction.atomic():
+            removed = sorted(model.objects.select_for_update().filter(
+                user=user, recipes__in=recipe_ids
+            ).values_list('recipes', flat=True))
+            model.objects.filter(user=user, recipes__in=removed).delete()
+            update_counter(
+                Recipe.objects.filter(pk__in=removed), counter, -1
+            )
+        return Response({
+            'removed': removed,
+            'not_present': sorted(set(recipe_ids) - set(removed)),
+        })
+
     @action(
         methods=['get'],
         detail=True,
@@ -227,24 +358,49 @@ class RecipeViewSet(viewsets.ModelViewSet):
         detail=True,
     )
     def shopping_cart(self, request, pk=None):
-        return self.action_base_post()
+        return self.action_base_post('in_carts_count')
 
     @shopping_cart.mapping.delete
     def delete_shopping_cart(self, request, pk=None):
-        return self.action_base_delete(ShoppingList.objects)
+        return self.action_base_delete(
+            ShoppingList.objects, 'in_carts_count'
+        )
+
+    @action(
+        methods=['post'],
+        detail=False,
+        url_path='shopping_cart/bulk',
+        permission_classes=[IsAuthenticated],
+    )
+    def shopping_cart_bulk(self, request):
+        return self.action_bulk_post(ShoppingList, 'in_carts_count')
+
+    @shopping_cart_bulk.mapping.delete
+    def delete_shopping_cart_bulk(self, request):
+        return self.action_bulk_delete(ShoppingList, 'in_carts_count')
 
     @action(
         methods=['get'],
         detail=False,
+        permission_classes=[IsAuthenticated],
     )
     def download_shopping_cart(self, request, pk=None):
-        shopping_list = get_shopping_list(self.request.user)
-        response = FileResponse(
-            iter([shopping_list.getvalue()]), content_type='text/csv'
+        export_format = request.query_params.get('format') or 'csv'
+        if export_format not in SHOPPING_LIST_FORMATS:
+            return Response(
+                {'format': [
+                    f'Допустимые значения: '
+                    f'{", ".join(SHOPPING_LIST_FORMATS)}.'
+                ]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        content_type, content = stream_shopping_list(
+            request.user, export_format
+        )
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{SHOPPING_LIST_FILENAME}.{export_format}"'
         )
-        response[
-            'Content-Disposition'
-        ] = 'attachment; filename="shopping_cart.csv"'
         return response
 
     @action(
@@ -252,17 +408,85 @@ class RecipeViewSet(viewsets.ModelViewSet):
         detail=True,
     )
     def favorite(self, request, pk=None):
-        return self.action_base_post()
+        return self.action_base_post('favorites_count')
 
     @favorite.mapping.delete
     def delete_favorite(self, request, pk=None):
-        return self.action_base_delete(Favorite.objects)
+        return self.action_base_delete(Favorite.objects, 'favorites_count')
+
+    @action(
+        methods=['post'],
+        detail=False,
+        url_path='favorite/bulk',
+        permission_classes=[IsAuthenticated],
+    )
+    def favorite_bulk(self, request):
+        return self.action_bulk_post(Favorite, 'favorites_count')
+
+    @favorite_bulk.mapping.delete
+    def delete_favorite_bulk(self, request):
+        return self.action_bulk_delete(Favorite, 'favorites_count')
+
+    @action(
+        methods=['get'],
+        detail=False,
+        permission_classes=[IsAuthenticated],
+    )
+    def recommended(self, request):
+        limit = request.query_params.get('limit', '')
+        limit = min(
+            int(limit) if limit.isdigit() and int(limit)
+            else RECOMMENDATIONS_LIMIT,
+            RECOMMENDATIONS_MAX_LIMIT
+        )
+        ranks = {
+            recipe_id: rank for rank, (recipe_id, _) in enumerate(
+                get_recommendations(request.user, limit)
+            )
+        }
+        if ranks:
+            recipes = sorted(
+                self.get_queryset().filter(pk__in=ranks),
+                key=lambda recipe: ranks[recipe.pk]
+            )
+        else:
+            # Nothing to go on yet: fall back to the most favorited
+            # recipes the user does not have.
+            recipes = self.get_queryset().exclude(
+                favorite_recipes__user=request.user
+            ).exclude(
+                shoppinglist_recipes__user=request.user
+            ).order_by('-favorites_count', '-pk')[:limit]
+        serializer = self.get_serializer(recipes, many=True)
+        return Response(serializer.data)
+
+    @action(
+        methods=['get'],
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        pagination_class=FeedPagination,
+    )
+    def feed(self, request):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def perform_content_negotiation(self, request, force=False):
+        if self.action == 'download_shopping_cart':
+            # ?format= selects the export format here, not a DRF renderer.
+            force = True
+        return super().perform_content_negotiation(request, force)
 
     def get_serializer_class(self):
         if self.action in ['shopping_cart', 'download_shopping_cart']:
             return ShoppingListSerializer
         if self.action == 'favorite':
             return FavoriteSerializer
+        if self.action in (
+            'shopping_cart_bulk', 'delete_shopping_cart_bulk',
+            'favorite_bulk', 'delete_favorite_bulk',
+        ):
+            return RecipeBulkSerializer
         if self.request.method == 'GET':
             return RecipeGetSerializer
         return super().get_serializer_class()
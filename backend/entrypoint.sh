@@ -3,4 +3,14 @@ sleep 3
 python manage.py migrate
 python manage.py collectstatic  --noinput
 cp -r /app/collected_static/. /backend_static/static/
-gunicorn --bind 0.0.0.0:8000 foodgram.wsgi
\ No newline at end of file
+
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# Workers, threads and timeouts are configured in gunicorn.conf.py.
+if [ "$SERVER_MODE" = "asgi" ]; then
+    gunicorn foodgram.asgi:application
+else
+    gunicorn foodgram.wsgi
+fi
\ No newline at end of file
@@ -0,0 +1,129 @@
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, size, conn_params):
+    """Return the connection pool of this process for a database alias.
+
+    Pools are created lazily and keyed by pid, so workers forked from a
+    preloaded master never share the master's sockets.
+    """
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = pool.ThreadedConnectionPool(0, size, **conn_params)
+        return _pools[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend with connection health checks and an optional
+    in-process connection pool.
+
+    CONN_HEALTH_CHECKS checks a reused connection once per request
+    before the first query and reconnects if the server dropped it.
+    POOL_SIZE > 0 takes connections from a pool of that size instead of
+    opening a new one for every request; when the pool is exhausted a
+    regular connection is opened and closed as usual.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        self.pool = None
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    @property
+    def pool_size(self):
+        return self.settings_dict.get('POOL_SIZE', 0)
+
+    def get_new_connection(self, conn_params):
+        self.health_check_done = True
+        self.pool = None
+        if not self.pool_size:
+            return super().get_new_connection(conn_params)
+        connections = get_pool(self.alias, self.pool_size, conn_params)
+        connection = self.get_pooled_connection(connections)
+        if connection is None:
+            return super().get_new_connection(conn_params)
+        self.pool = connections
+        # Apply the same per-connection settings as the parent backend.
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        base.psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def get_pooled_connection(self, connections):
+        """Take a live connection from the pool, or None.
+
+        Dead connections are closed and dropped from the pool. After
+        pool_size of them in a row, e.g. once the server restarted, or
+        when the pool is exhausted the caller connects directly.
+        """
+        for _ in range(self.pool_size):
+            try:
+                connection = connections.getconn()
+            except pool.PoolError:
+                return None
+            if not self.health_check_enabled or self.connection_is_usable(
+                connection
+            ):
+                return connection
+            connections.putconn(connection, close=True)
+        return None
+
+    def connection_is_usable(self, connection):
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except base.Database.Error:
+            return False
+        # The check must not leave a transaction open on the connection.
+        connection.rollback()
+        return True
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+            or self.in_atomic_block
+        ):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # Called at the start and the end of every request.
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.pool.putconn(
+                self.connection,
+                close=self.connection.closed or self.errors_occurred
+            )
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -23,6 +24,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework.authtoken',
     'rest_framework',
     'djoser',
@@ -31,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,6 +43,31 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+SQL_PROFILING = os.getenv('SQL_PROFILING', 'False').lower() == 'true'
+SQL_PROFILING_SLOW_MS = float(os.getenv('SQL_PROFILING_SLOW_MS', 500))
+SQL_PROFILING_SAMPLE_RATE = float(os.getenv('SQL_PROFILING_SAMPLE_RATE', 1))
+SQL_PROFILING_BUFFER_SIZE = int(os.getenv('SQL_PROFILING_BUFFER_SIZE', 100))
+
+if SQL_PROFILING:
+    MIDDLEWARE.insert(0, 'api.profiling.SQLProfilingMiddleware')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = 'foodgram.urls'
 
 TEMPLATES = [
@@ -60,6 +88,17 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'foodgram.wsgi.application'
 
+ASGI_APPLICATION = 'foodgram.asgi.application'
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+ASYNC_READ_VIEWS = SERVER_MODE == 'asgi'
+
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', 32))
+
+# Background threads rendering image renditions; 0 renders inline.
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
@@ -67,17 +106,83 @@ WSGI_APPLICATION = 'foodgram.wsgi.application'
 #     }
 # }
 
+# DB_POOL_MODE:
+#   persistent - every thread keeps its connection for DB_CONN_MAX_AGE s;
+#   pool - connections are taken from an in-process pool per request;
+#   pgbouncer - persistent connections to pgbouncer in transaction mode,
+#       which does not support server-side cursors.
+DB_POOL_MODE = os.getenv('DB_POOL_MODE', 'persistent')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'foodgram.db',
         'NAME': os.getenv('POSTGRES_DB', 'foodgram'),
         'USER': os.getenv('POSTGRES_USER', 'foodgram_user'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_MAX_AGE': (
+            0 if DB_POOL_MODE == 'pool'
+            else int(os.getenv('DB_CONN_MAX_AGE', 60))
+        ),
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', 'True'
+        ).lower() == 'true',
+        'POOL_SIZE': (
+            int(os.getenv('DB_POOL_SIZE', 10))
+            if DB_POOL_MODE == 'pool' else 0
+        ),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_POOL_MODE == 'pgbouncer',
     }
 }
 
+# Read replicas as a comma separated list of host[:port].
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv(
+    'DB_REPLICA_HOSTS', ''
+).split(','))):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('api.metrics.MetricsMiddleware') + 1,
+        'api.replicas.ReplicaRoutingMiddleware'
+    )
+
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', 'foodgram'),
+    }
+}
+# Cache versions, replica stickiness and the autocomplete index rely on
+# every process seeing the same cache; gunicorn.conf.py refuses to start
+# several workers without it.
+CACHE_IS_SHARED = CACHE_BACKEND not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+if DATABASE_REPLICAS and not CACHE_IS_SHARED:
+    # The read-your-writes flag is kept in the cache; a per-process cache
+    # would send the next read to a lagging replica from another worker.
+    raise ImproperlyConfigured(
+        'DB_REPLICA_HOSTS requires a shared CACHE_BACKEND such as Redis.'
+    )
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -134,4 +239,6 @@ STATIC_ROOT = BASE_DIR / 'collected_static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+DEFAULT_FILE_STORAGE = 'api.storage.ContentAddressedStorage'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
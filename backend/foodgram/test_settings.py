@@ -0,0 +1,47 @@
+"""Settings for the test suite, run with
+
+    python manage.py test --settings=foodgram.test_settings
+
+Two local SQLite databases stand in for PostgreSQL: replica_0 is only
+routed to by tests that enable ReplicaRouter themselves.
+"""
+import os
+import tempfile
+
+os.environ.setdefault('SECRET_KEY', 'test')
+os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+
+from foodgram.settings import *  # noqa: E402,F401,F403
+from foodgram.settings import MIDDLEWARE  # noqa: E402
+
+TEST_DIR = tempfile.mkdtemp(prefix='foodgram-test-')
+
+# Tests run on in-memory databases; the names only matter for
+# connections made after teardown, e.g. by a flush at exit.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(TEST_DIR, 'default.sqlite3'),
+    },
+    'replica_0': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(TEST_DIR, 'replica.sqlite3'),
+    },
+}
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = []
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware != 'api.replicas.ReplicaRoutingMiddleware'
+]
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'foodgram-test',
+    }
+}
+
+MEDIA_ROOT = os.path.join(TEST_DIR, 'media')
+IMAGE_WORKERS = 0
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -3,11 +3,30 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from api.async_views import async_read_view
+from api.metrics import metrics_view
+from api.profiling import slow_requests_view
+from api.shortlinks import short_link_redirect
+
 urlpatterns = [
     path('', include('api.urls')),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
+    path(
+        's/<str:code>',
+        async_read_view(short_link_redirect)
+        if settings.ASYNC_READ_VIEWS else short_link_redirect,
+        name='short-link'
+    ),
 ]
 
+if settings.SQL_PROFILING:
+    urlpatterns.insert(0, path(
+        'admin/slow-requests/',
+        admin.site.admin_view(slow_requests_view),
+        name='slow-requests'
+    ))
+
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import time
+
+from prometheus_client import multiprocess
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+if os.getenv('SERVER_MODE', 'wsgi') == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    worker_class = 'gthread'
+    threads = env_int('GUNICORN_THREADS', 4)
+
+# Sync Django work is mostly CPU plus DB waits: two workers per core
+# keep the cores busy, threads cover the DB round trips.
+workers = env_int('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+
+# Import the application once in the master so workers share its memory
+# pages copy-on-write instead of each loading Django on its own.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+# Recycle workers periodically to cap memory growth; the jitter keeps
+# them from restarting all at once.
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+SLOW_REQUEST_MS = env_int('GUNICORN_SLOW_REQUEST_MS', 1000)
+
+
+def on_starting(server):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+    from django.conf import settings
+
+    if server.cfg.workers > 1 and not settings.CACHE_IS_SHARED:
+        server.log.error(
+            '%s is local to each process, %d workers would serve stale '
+            'cached data. Set CACHE_BACKEND to a shared cache (Redis) '
+            'or GUNICORN_WORKERS=1.',
+            settings.CACHE_BACKEND, server.cfg.workers
+        )
+        raise SystemExit(1)
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared by workers.
+    from django.db import connections
+
+    connections.close_all()
+
+
+def pre_request(worker, req):
+    req.start_time = time.perf_counter()
+
+
+def post_request(worker, req, environ, resp):
+    duration = (time.perf_counter() - req.start_time) * 1000
+    if duration >= SLOW_REQUEST_MS:
+        worker.log.warning(
+            'Slow request: worker %s %s %s took %.1f ms',
+            worker.pid, req.method, req.path, duration
+        )
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
@@ -20,6 +20,7 @@ class RecipeAdmin(admin.ModelAdmin):
         'cooking_time',
         'image',
         'short_link',
+        'short_link_clicks',
     ]
     search_fields = ['name', 'author__username']
     list_filter = ['tags']
@@ -0,0 +1,89 @@
+from collections import Counter
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+class AtomicFieldsMixin:
+    """Leave columns maintained by atomic UPDATEs out of full saves.
+
+    Counters are shifted with F() and renditions are written by a
+    background job; a plain save() of an instance loaded earlier would
+    write their stale values back. Pass update_fields to save them.
+    """
+
+    atomic_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.atomic_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+def count_subquery(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def recount_counters(recipe_model, user_model, favorite_model,
+                     shopping_list_model, subscription_model):
+    """Recompute denormalized counters from the source tables.
+
+    Returns the number of updated recipes and users.
+    """
+    recipes = recipe_model.objects.update(
+        favorites_count=count_subquery(favorite_model, 'recipes'),
+        in_carts_count=count_subquery(shopping_list_model, 'recipes'),
+    )
+    users = user_model.objects.update(
+        subscribers_count=count_subquery(subscription_model, 'subscriber'),
+        recipes_count=count_subquery(recipe_model, 'author'),
+    )
+    return recipes, users
+
+
+def recount_media_references(media_file_model, recipe_model, user_model):
+    """Rebuild MediaFile reference counts from the image fields.
+
+    A row references each distinct name once, as the signals count it:
+    renditions of a small image share the original's content hash.
+    Returns the number of referenced files.
+    """
+    references = Counter()
+    for model, fields in (
+        (recipe_model, ('image', 'image_renditions')),
+        (user_model, ('avatar', 'avatar_renditions')),
+    ):
+        rows = model.objects.values_list(*fields).iterator()
+        for name, renditions in rows:
+            references.update(
+                {name, *(renditions or {}).values()} - {'', None}
+            )
+    media_file_model.objects.all().delete()
+    media_file_model.objects.bulk_create(
+        (
+            media_file_model(name=name, references=count)
+            for name, count in references.items()
+        ),
+        batch_size=1000
+    )
+    return len(references)
@@ -0,0 +1,278 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, models, transaction
+
+from api.signals import invalidate_model_cache
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def get_model(model_name):
+    if model_name == 'User':
+        return get_user_model()
+    try:
+        if '.' in model_name:
+            return apps.get_model(model_name)
+        return apps.get_model(app_label='recipes', model_name=model_name)
+    except (LookupError, ValueError):
+        raise CommandError(f'Модель {model_name} не найдена.')
+
+
+def iter_csv(file):
+    yield from csv.DictReader(file)
+
+
+def iter_json_lines(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_json_array(file):
+    """Decode a JSON array of objects one element at a time."""
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Ожидается JSON-массив объектов.')
+    position = 1
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if buffer.startswith(']', position):
+            return
+        try:
+            obj, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                raise CommandError('Некорректный JSON-файл.')
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield obj
+
+
+READERS = {
+    'csv': iter_csv,
+    'json': iter_json_array,
+    'jsonl': iter_json_lines,
+}
+
+
+class Loader:
+    """Validate rows in batches and upsert them by a unique field."""
+
+    def __init__(self, model, unique_field=None, lookups=None):
+        self.model = model
+        self.unique_field = unique_field
+        self.lookups = lookups or {}
+        self.fk_maps = {}
+        self.created = 0
+        self.updated = 0
+
+    def get_unique_field(self, row):
+        if self.unique_field:
+            return self.unique_field
+        for field in self.model._meta.concrete_fields:
+            if field.unique and not field.primary_key and field.name in row:
+                return field.name
+        return self.model._meta.pk.name if 'id' in row else None
+
+    def get_fk_map(self, field):
+        if field.name not in self.fk_maps:
+            lookup = self.lookups.get(field.name, 'pk')
+            self.fk_maps[field.name] = {
+                str(key): pk for key, pk in
+                field.related_model.objects.values_list(lookup, 'pk')
+            }
+        return self.fk_maps[field.name]
+
+    def build(self, row):
+        values, foreign_keys = {}, []
+        for name, value in row.items():
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                raise ValidationError(f'Неизвестное поле {name}.')
+            if isinstance(field, models.ForeignKey):
+                foreign_keys.append(field.name)
+                if value in ('', None):
+                    values[field.attname] = None
+                    continue
+                try:
+                    values[field.attname] = self.get_fk_map(field)[str(value)]
+                except KeyError:
+                    raise ValidationError(
+                        f'{field.name}: объект {value} не найден.'
+                    )
+            elif field.many_to_many or not field.concrete:
+                raise ValidationError(f'Поле {name} не поддерживается.')
+            else:
+                values[field.attname] = value
+        obj = self.model(**values)
+        # Foreign keys are already checked against the prefetched maps.
+        obj.full_clean(exclude=foreign_keys, validate_unique=False)
+        return obj
+
+    def save(self, objs, key, fields):
+        if key is None:
+            self.model.objects.bulk_create(objs)
+            self.created += len(objs)
+            return
+        existing = self.model.objects.in_bulk(
+            [getattr(obj, key) for obj in objs], field_name=key
+        )
+        to_create, to_update = [], []
+        for obj in objs:
+            current = existing.get(getattr(obj, key))
+            if current is None:
+                to_create.append(obj)
+            else:
+                obj.pk = current.pk
+                to_update.append(obj)
+        self.model.objects.bulk_create(to_create)
+        update_fields = [field for field in fields if field != key]
+        if to_update and update_fields:
+            self.model.objects.bulk_update(to_update, update_fields)
+        self.created += len(to_create)
+        self.updated += len(to_update)
+
+    def load_batch(self, rows, start, dry_run=False, skip_invalid=False):
+        """Validate and store one batch, return validation errors."""
+        objs, errors = {}, []
+        key = self.get_unique_field(rows[0])
+        fields = [
+            self.model._meta.get_field(name).name for name in rows[0]
+        ]
+        for number, row in enumerate(rows, start=start + 1):
+            try:
+                obj = self.build(row)
+            except ValidationError as error:
+                if hasattr(error, 'error_dict'):
+                    messages = [
+                        f'{field}: {message}'
+                        for field, field_messages in error.message_dict.items()
+                        for message in field_messages
+                    ]
+                else:
+                    messages = error.messages
+                errors.append(f'Строка {number}: {"; ".join(messages)}')
+                continue
+            objs[getattr(obj, key) if key else number] = obj
+        if errors and not skip_invalid:
+            return errors
+        if objs:
+            # A dry run writes too and rolls back, so it counts the rows
+            # and hits the same database constraints as a real load.
+            try:
+                with transaction.atomic():
+                    self.save(list(objs.values()), key, fields)
+                    transaction.set_rollback(dry_run)
+            except IntegrityError as error:
+                errors.append(
+                    f'Строки {start + 1}-{start + len(rows)}: пакет не '
+                    f'сохранен: {error}'
+                )
+        return errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из CSV/JSON-файла в базу данных пакетами, '
+        'обновляя уже существующие записи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('data_file', type=str, help='Путь к файлу')
+        parser.add_argument('model_name', type=str, help='Имя модели')
+        parser.add_argument(
+            '--format', choices=READERS,
+            help='Формат файла, по умолчанию определяется по расширению'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в пакете'
+        )
+        parser.add_argument(
+            '--skip', type=int, default=0,
+            help='Пропустить первые N строк (продолжение загрузки)'
+        )
+        parser.add_argument(
+            '--unique-field',
+            help='Поле для поиска существующих записей'
+        )
+        parser.add_argument(
+            '--lookup', action='append', default=[],
+            help='Поле связанной модели для внешнего ключа: author=username'
+        )
+        parser.add_argument(
+            '--skip-invalid', action='store_true',
+            help='Пропускать строки с ошибками вместо остановки'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только проверить данные, ничего не сохраняя'
+        )
+
+    def handle(self, *args, **options):
+        data_file = Path(options['data_file'])
+        model = get_model(options['model_name'])
+        data_format = options['format'] or data_file.suffix.lstrip('.')
+        if data_format not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {data_format}')
+        try:
+            lookups = dict(
+                lookup.split('=', 1) for lookup in options['lookup']
+            )
+        except ValueError:
+            raise CommandError('--lookup ожидает значение вида поле=атрибут')
+        loader = Loader(model, options['unique_field'], lookups)
+        batch_size = options['batch_size']
+        processed = skip = options['skip']
+        started = time.perf_counter()
+        self.stdout.write(
+            self.style.NOTICE(f'Загрузка данных из файла {data_file}')
+        )
+        with open(data_file, 'r', encoding='utf-8-sig') as file:
+            rows = READERS[data_format](file)
+            for _ in islice(rows, skip):
+                pass
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                errors = loader.load_batch(
+                    batch, processed, options['dry_run'],
+                    options['skip_invalid']
+                )
+                for error in errors:
+                    self.stderr.write(error)
+                if errors and not options['skip_invalid']:
+                    raise CommandError(
+                        f'Загрузка остановлена. Сохранено строк: '
+                        f'{processed}, продолжить можно с --skip '
+                        f'{processed}'
+                    )
+                processed += len(batch)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'Обработано строк: {processed} '
+                    f'({(processed - skip) / elapsed:.0f} строк/с)'
+                )
+        if not options['dry_run']:
+            invalidate_model_cache(model)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {elapsed:.2f} с: создано {loader.created}, '
+            f'обновлено {loader.updated}'
+            + (' (пробный запуск, изменения не сохранены)'
+               if options['dry_run'] else '')
+        ))
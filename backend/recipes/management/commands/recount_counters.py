@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.counters import recount_counters
+from recipes.models import (
+    Favorite,
+    Recipe,
+    ShoppingList,
+    Subscription,
+    User,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счетчики избранного, корзин, подписчиков '
+        'и рецептов по исходным таблицам.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            recipes, users = recount_counters(
+                Recipe, User, Favorite, ShoppingList, Subscription
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Счетчики пересчитаны: рецептов {recipes}, '
+                f'пользователей {users}'
+            )
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.3 on 2026-10-17 07:11
+
+import api.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_ingredientamount_unique_ingredientamount'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ingredientamount',
+            name='amount',
+            field=models.PositiveIntegerField(validators=[api.validators.ingredient_amount_validator], verbose_name='Amount'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 3.2.3 on 2026-10-17 07:15
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+POSTGRES_FORWARDS = [
+    """
+    CREATE FUNCTION recipes_recipe_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A')
+            || setweight(to_tsvector('russian', coalesce(NEW.text, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, text ON recipes_recipe
+    FOR EACH ROW EXECUTE FUNCTION recipes_recipe_search_vector_update();
+    """,
+    'UPDATE recipes_recipe SET name = name;',
+    'CREATE INDEX recipes_recipe_search_vector_gin '
+    'ON recipes_recipe USING gin (search_vector);',
+    'CREATE INDEX recipes_recipe_name_trgm '
+    'ON recipes_recipe USING gin (UPPER(name) gin_trgm_ops);',
+    'CREATE INDEX recipes_ingredient_name_trgm '
+    'ON recipes_ingredient USING gin (UPPER(name) gin_trgm_ops);',
+]
+
+POSTGRES_BACKWARDS = [
+    'DROP INDEX IF EXISTS recipes_ingredient_name_trgm;',
+    'DROP INDEX IF EXISTS recipes_recipe_name_trgm;',
+    'DROP INDEX IF EXISTS recipes_recipe_search_vector_gin;',
+    'DROP TRIGGER IF EXISTS recipes_recipe_search_vector_trigger '
+    'ON recipes_recipe;',
+    'DROP FUNCTION IF EXISTS recipes_recipe_search_vector_update();',
+]
+
+
+def run_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_ingredientamount_amount_not_unique'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_postgres(POSTGRES_FORWARDS),
+            run_postgres(POSTGRES_BACKWARDS),
+        ),
+    ]
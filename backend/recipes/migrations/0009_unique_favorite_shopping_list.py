@@ -0,0 +1,64 @@
+# Generated by Django 3.2.3 on 2026-10-17 08:31
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def recount_counters(apps):
+    Favorite = apps.get_model('recipes', 'Favorite')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    ShoppingList = apps.get_model('recipes', 'ShoppingList')
+    Subscription = apps.get_model('recipes', 'Subscription')
+    User = apps.get_model('users', 'User')
+    Recipe.objects.update(
+        favorites_count=count_subquery(Favorite, 'recipes'),
+        in_carts_count=count_subquery(ShoppingList, 'recipes'),
+    )
+    User.objects.update(
+        subscribers_count=count_subquery(Subscription, 'subscriber'),
+        recipes_count=count_subquery(Recipe, 'author'),
+    )
+
+
+def delete_duplicates(apps, schema_editor):
+    for model_name in ('Favorite', 'ShoppingList'):
+        model = apps.get_model('recipes', model_name)
+        keep = model.objects.values('user', 'recipes').annotate(
+            keep_id=Min('id')
+        ).values('keep_id')
+        model.objects.exclude(id__in=keep).delete()
+    recount_counters(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_short_link_clicks'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='shoppinglist',
+            constraint=models.UniqueConstraint(fields=('user', 'recipes'), name='unique_shopping_list'),
+        ),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('user', 'recipes'), name='unique_favorite'),
+        ),
+    ]
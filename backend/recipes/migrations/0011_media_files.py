@@ -0,0 +1,51 @@
+# Generated by Django 3.2.3 on 2026-10-17 07:48
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def fill_references(apps, schema_editor):
+    # Each distinct name counts once per row, as the signals count it.
+    MediaFile = apps.get_model('recipes', 'MediaFile')
+    references = Counter()
+    for model, fields in (
+        (apps.get_model('recipes', 'Recipe'), ('image', 'image_renditions')),
+        (apps.get_model('users', 'User'), ('avatar', 'avatar_renditions')),
+    ):
+        rows = model.objects.values_list(*fields).iterator()
+        for name, renditions in rows:
+            references.update(
+                {name, *(renditions or {}).values()} - {'', None}
+            )
+    MediaFile.objects.bulk_create(
+        (
+            MediaFile(name=name, references=count)
+            for name, count in references.items()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_image_renditions'),
+        ('users', '0005_user_avatar_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Name')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='References')),
+            ],
+            options={
+                'verbose_name': 'Media file',
+                'verbose_name_plural': 'Media files',
+            },
+        ),
+        migrations.RunPython(fill_references, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,15 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
-from django.utils.text import slugify
 from django.contrib.auth import get_user_model
 
+from api import base62
+from recipes.counters import AtomicFieldsMixin
 from api.validators import cooking_time_validator, ingredient_amount_validator
 from api.constants import (MAX_LENGTH_TAG,
                            MAX_LENGTH_SLUG,
                            MAX_LENGTH_INGREDIENT,
                            MAX_LENGTH_MEASURMENT,
-                           MAX_LENGTH_RECIPE,
-                           MAX_LENGTH_RECIPE_SHORT)
+                           MAX_LENGTH_RECIPE)
 
 
 User = get_user_model()
@@ -52,7 +53,11 @@ class Ingredient(models.Model):
         return self.name
 
 
-class Recipe(models.Model):
+class Recipe(AtomicFieldsMixin, models.Model):
+    atomic_fields = (
+        'favorites_count', 'in_carts_count', 'short_link_clicks',
+        'image_renditions', 'search_vector',
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE,
         related_name='recipe', verbose_name='Author'
@@ -74,22 +79,41 @@ class Recipe(models.Model):
         related_name='recipes'
     )
     tags = models.ManyToManyField(Tag)
-    short_link = models.SlugField(
-        unique=True, blank=True,
-    )
     pub_date = models.DateTimeField('Publication date', auto_now_add=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    favorites_count = models.PositiveIntegerField(
+        'Favorites count', default=0, editable=False
+    )
+    in_carts_count = models.PositiveIntegerField(
+        'In shopping carts count', default=0, editable=False
+    )
+    short_link_clicks = models.PositiveIntegerField(
+        'Short link clicks', default=0, editable=False
+    )
+    image_renditions = models.JSONField(
+        'Image renditions', default=dict, blank=True, editable=False
+    )
 
-    def save(self, *args, **kwargs):
-        if not self.short_link:
-            self.short_link = slugify(
-                self.name, allow_unicode=True
-            )[:MAX_LENGTH_RECIPE_SHORT]
-        super().save(*args, **kwargs)
+    @property
+    def short_link(self):
+        return base62.encode(self.id)
 
     class Meta:
         verbose_name = 'Recipe'
         verbose_name_plural = 'Recipes'
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'], name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['favorites_count'], name='recipe_favorites_count_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='recipe_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -105,7 +129,7 @@ class IngredientAmount(models.Model):
         verbose_name='Ingredient'
     )
     amount = models.PositiveIntegerField(
-        'Amount', unique=True,
+        'Amount',
         validators=[
             ingredient_amount_validator
         ]
@@ -165,6 +189,12 @@ class ShoppingList(models.Model):
     class Meta:
         verbose_name = 'Shopping list'
         verbose_name_plural = 'Shopping lists'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipes'],
+                name="unique_shopping_list"
+            ),
+        ]
 
 
 class Favorite(models.Model):
@@ -180,3 +210,71 @@ class Favorite(models.Model):
     class Meta:
         verbose_name = 'Favorite'
         verbose_name_plural = 'Favorites'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipes'],
+                name="unique_favorite"
+            ),
+        ]
+
+
+class MediaFile(models.Model):
+    name = models.CharField('Name', max_length=255, unique=True)
+    references = models.PositiveIntegerField('References', default=0)
+
+    class Meta:
+        verbose_name = 'Media file'
+        verbose_name_plural = 'Media files'
+
+    def __str__(self):
+        return self.name
+
+
+class RecipeSimilarity(models.Model):
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        related_name='similar_recipes', verbose_name='Recipe'
+    )
+    similar = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        related_name='+', verbose_name='Similar recipe'
+    )
+    score = models.FloatField('Score')
+
+    class Meta:
+        verbose_name = 'Recipe similarity'
+        verbose_name_plural = 'Recipe similarities'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'similar'],
+                name="unique_recipe_similarity"
+            ),
+        ]
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name='feed_entries', verbose_name='User'
+    )
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        related_name='feed_entries', verbose_name='Recipe'
+    )
+    pub_date = models.DateTimeField('Publication date')
+
+    class Meta:
+        verbose_name = 'Feed entry'
+        verbose_name_plural = 'Feed entries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name="unique_feed_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'recipe'],
+                name='feed_entry_user_pub_date_idx'
+            ),
+        ]
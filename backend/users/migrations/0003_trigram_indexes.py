@@ -0,0 +1,33 @@
+# Generated by Django 3.2.3 on 2026-10-17 07:15
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def create_username_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX users_user_username_trgm '
+        'ON users_user USING gin (UPPER(username) gin_trgm_ops);'
+    )
+
+
+def drop_username_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS users_user_username_trgm;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_auto_20240728_1513'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(
+            create_username_trgm_index, drop_username_trgm_index
+        ),
+    ]
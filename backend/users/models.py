@@ -5,12 +5,16 @@ from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.utils.translation import gettext_lazy
 
 from api.validators import username_not_me_validator
+from recipes.counters import AtomicFieldsMixin
 from api.constants import (MAX_LENGTH_NAME,
                            MAX_LENGTH_EMAIL,
                            MAX_LENGTH_ROLE)
 
 
-class User(AbstractUser):
+class User(AtomicFieldsMixin, AbstractUser):
+    atomic_fields = (
+        'avatar_renditions', 'subscribers_count', 'recipes_count'
+    )
 
     class Roles(models.TextChoices):
         ADMIN = 'admin', gettext_lazy('Admin')
@@ -43,18 +47,27 @@ class User(AbstractUser):
         null=True,
         blank=True
     )
+    avatar_renditions = models.JSONField(
+        'Avatar renditions', default=dict, blank=True, editable=False
+    )
     role = models.CharField(
         'Role',
         max_length=MAX_LENGTH_ROLE,
         choices=Roles.choices,
         default=Roles.USER,
     )
+    subscribers_count = models.PositiveIntegerField(
+        'Subscribers count', default=0, editable=False
+    )
+    recipes_count = models.PositiveIntegerField(
+        'Recipes count', default=0, editable=False
+    )
 
     def update_password(self, old_password, new_password):
         if not self.check_password(old_password):
             raise ValueError("Your current password is not valid")
         self.set_password(new_password)
-        self.save()
+        self.save(update_fields=['password'])
 
     def check_password(self, raw_password):
         return hashers.check_password(raw_password, self.password)